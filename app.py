@@ -535,8 +535,12 @@ def view_file(file_id):
             decrypt_file(temp_encrypted_path, temp_decrypted_path, None)
             
             def generate():
+                # Fixed 1 MiB chunks: iterating the file object splits on
+                # newline bytes, which for binary data means tiny,
+                # arbitrary-sized yields
                 with open(temp_decrypted_path, 'rb') as f:
-                    yield from f
+                    while chunk := f.read(1 << 20):
+                        yield chunk
                 # Cleanup after streaming
                 if os.path.exists(temp_encrypted_path):
                     os.remove(temp_encrypted_path)
@@ -562,7 +566,8 @@ def view_file(file_id):
             
             def generate():
                 with open(temp_view_path, 'rb') as f:
-                    yield from f
+                    while chunk := f.read(1 << 20):
+                        yield chunk
                 if os.path.exists(temp_view_path):
                     os.remove(temp_view_path)
 
@@ -0,0 +1,29 @@
+"""
+Shared pytest fixtures for the moderation test modules
+"""
+
+import pytest
+
+from content_moderator import ContentModerator
+
+# Manual diagnostic scripts that run at import time and define no test
+# functions. test_auto_init.py deletes db/cloud.db and moves the tracked
+# db/cloud.db.backup over it; the others connect to the database or run
+# detection as a side effect. Keep them out of collection so a pytest
+# run (even bare --collect-only) never mutates the working tree; run
+# them directly with python when needed.
+collect_ignore = [
+    "test_auto_init.py",
+    "test_db_connection.py",
+    "test_similarity.py",
+]
+
+
+@pytest.fixture(scope="session")
+def moderator():
+    """One ContentModerator for the whole session.
+
+    Construction fits three TF-IDF vectorizers; sharing the instance
+    means that work happens once instead of once per test module.
+    """
+    return ContentModerator()
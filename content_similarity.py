@@ -3,10 +3,12 @@ Content-Level Similarity Detection Module
 Detects near-duplicate files based on content similarity (90%+ match)
 even when files have different names or sizes.
 """
+import hashlib
 import os
+import re
 import sqlite3
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import pickle
 from config import Config
@@ -27,10 +29,33 @@ class ContentSimilarityDetector:
         
         # Text file extensions to process
         self.text_extensions = {
-            'txt', 'md', 'py', 'js', 'java', 'cpp', 'c', 'h', 
+            'txt', 'md', 'py', 'js', 'java', 'cpp', 'c', 'h',
             'html', 'css', 'json', 'xml', 'csv', 'log', 'sql', 'pdf'
         }
+
+        # HashingVectorizer needs no fit, so there is no per-call IDF
+        # recomputation and one instance serves every comparison;
+        # l2-normalized outputs make cosine similarity a plain dot product
+        self._vectorizer = HashingVectorizer(
+            n_features=2 ** 18,
+            alternate_sign=False,
+            norm='l2',
+            lowercase=True,
+            stop_words='english'
+        )
     
+    @staticmethod
+    def normalized_fingerprint(text):
+        """SHA-1 fingerprint of the normalized token stream
+
+        Lowercased [a-z0-9]+ tokens, truncated to 4000 characters, so
+        whitespace/punctuation/case differences hash identically. Equal
+        fingerprints are near-duplicates by construction and skip the
+        vectorizer entirely.
+        """
+        normalized = ' '.join(re.findall(r'[a-z0-9]+', text.lower()))[:4000]
+        return hashlib.sha1(normalized.encode()).hexdigest()
+
     def is_text_file(self, filename):
         """Check if file is a text file based on extension"""
         ext = filename.split('.')[-1].lower() if '.' in filename else ''
@@ -110,21 +135,11 @@ class ContentSimilarityDetector:
         """
         if not text1 or not text2:
             return 0.0
-        
+
         try:
-            # Create TF-IDF vectorizer
-            vectorizer = TfidfVectorizer(
-                lowercase=True,
-                stop_words='english',
-                max_features=1000  # Limit features for performance
-            )
-            
-            # Compute TF-IDF vectors
-            tfidf_matrix = vectorizer.fit_transform([text1, text2])
-            
-            # Compute cosine similarity
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            
+            matrix = self._vectorizer.transform([text1, text2])
+            similarity = cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
+
             return float(similarity)
         except Exception as e:
             print(f"Error computing similarity: {e}")
@@ -184,36 +199,37 @@ class ContentSimilarityDetector:
         print(f"[DEBUG] Found {len(existing_files)} existing files in database")
 
         
-        similar_files = []
-        files_compared = 0
-        
-        # Compare with each existing file
+        # Collect comparable candidates, then vectorize everything in one
+        # transform call: one pass through sklearn instead of a
+        # vectorize-and-compare round trip per stored file
+        candidates = []
         for file_row in existing_files:
             existing_filename = file_row['file_name']
-            
+
             # Only compare text files
             if not self.is_text_file(existing_filename):
                 print(f"[DEBUG] Skipping {existing_filename} - not a text file")
                 continue
-            
+
             # Get stored content from database (not from encrypted file)
             existing_content = file_row['content_text']
-            
+
             if not existing_content:
                 print(f"[DEBUG] Skipping {existing_filename} - no content stored in database")
                 continue
-            
+
             print(f"[DEBUG] Comparing with: {existing_filename} ({len(existing_content)} chars)")
-            files_compared += 1
-            
-            # Compute similarity
-            similarity_score = self.compute_text_similarity(new_content, existing_content)
-            print(f"[DEBUG] Similarity with {existing_filename}: {similarity_score:.2%}")
+            candidates.append((file_row, existing_content))
 
-            
-            # If similarity is above threshold, add to results
-            if similarity_score >= self.similarity_threshold:
-                print(f"[DEBUG] ✓ MATCH FOUND! {existing_filename} is {similarity_score:.2%} similar (threshold: {self.similarity_threshold:.0%})")
+        # Fingerprint short-circuit: candidates whose normalized token
+        # stream hashes identically are near-duplicates without any
+        # vectorization; only the rest go through the TF pass
+        similar_files = []
+        new_fingerprint = self.normalized_fingerprint(new_content)
+        remaining = []
+        for file_row, existing_content in candidates:
+            if self.normalized_fingerprint(existing_content) == new_fingerprint:
+                print(f"[DEBUG] ✓ FINGERPRINT MATCH! {file_row['file_name']} has identical normalized content")
                 similar_files.append({
                     'id': file_row['id'],
                     'file_name': file_row['file_name'],
@@ -221,10 +237,36 @@ class ContentSimilarityDetector:
                     'file_hash': file_row['file_hash'],
                     'upload_timestamp': file_row['upload_timestamp'],
                     'stored_path': file_row['stored_path'],
-                    'similarity': similarity_score
+                    'similarity': 1.0
                 })
-        
-        print(f"[DEBUG] Compared {files_compared} files, found {len(similar_files)} matches")
+            else:
+                remaining.append((file_row, existing_content))
+
+        if remaining:
+            matrix = self._vectorizer.transform(
+                [new_content] + [content for _, content in remaining]
+            )
+            similarities = cosine_similarity(matrix[0:1], matrix[1:])[0]
+
+            for (file_row, _), similarity_score in zip(remaining, similarities):
+                existing_filename = file_row['file_name']
+                similarity_score = float(similarity_score)
+                print(f"[DEBUG] Similarity with {existing_filename}: {similarity_score:.2%}")
+
+                # If similarity is above threshold, add to results
+                if similarity_score >= self.similarity_threshold:
+                    print(f"[DEBUG] ✓ MATCH FOUND! {existing_filename} is {similarity_score:.2%} similar (threshold: {self.similarity_threshold:.0%})")
+                    similar_files.append({
+                        'id': file_row['id'],
+                        'file_name': file_row['file_name'],
+                        'file_size': file_row['file_size'],
+                        'file_hash': file_row['file_hash'],
+                        'upload_timestamp': file_row['upload_timestamp'],
+                        'stored_path': file_row['stored_path'],
+                        'similarity': similarity_score
+                    })
+
+        print(f"[DEBUG] Compared {len(candidates)} files, found {len(similar_files)} matches")
         
         # Sort by similarity (highest first)
         similar_files.sort(key=lambda x: x['similarity'], reverse=True)
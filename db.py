@@ -0,0 +1,40 @@
+"""
+Shared SQLite connection helper
+
+Central access point for scripts and helpers that talk to the app
+database directly. Connections are configured once — WAL journaling so
+commits stop fsyncing a rollback journal, NORMAL synchronous, and a
+larger page cache — then recycled through a pool instead of being
+re-opened and re-negotiated on every call.
+"""
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+from config import Config
+
+_POOL = queue.Queue()
+
+
+def get_conn():
+    """Take a configured connection from the pool, creating on demand."""
+    try:
+        return _POOL.get_nowait()
+    except queue.Empty:
+        conn = sqlite3.connect(Config.DATABASE, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')
+        return conn
+
+
+@contextmanager
+def connection():
+    """Check a connection out of the pool for the duration of a block."""
+    conn = get_conn()
+    try:
+        yield conn
+    finally:
+        _POOL.put(conn)
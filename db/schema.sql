@@ -38,6 +38,7 @@ CREATE TABLE IF NOT EXISTS logs (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     action TEXT NOT NULL,
     details TEXT,
+    user_id INTEGER,
     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -83,3 +84,10 @@ CREATE TABLE IF NOT EXISTS moderation_logs (
 CREATE INDEX IF NOT EXISTS idx_moderation_user ON moderation_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_moderation_timestamp ON moderation_logs(timestamp);
 CREATE INDEX IF NOT EXISTS idx_moderation_reviewed ON moderation_logs(reviewed);
+
+-- Composite indexes for the suspicious-upload detector: the per-upload
+-- threshold COUNTs become index range scans instead of table scans
+CREATE INDEX IF NOT EXISTS idx_uploads_user_ts ON uploads(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_action_ts ON logs(action, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_user_action_ts ON logs(user_id, action, timestamp);
+CREATE INDEX IF NOT EXISTS idx_suspicious_user_type_ts ON suspicious_activities(user_id, activity_type, timestamp);
@@ -0,0 +1,75 @@
+"""
+Database Migration Script
+Adds user_id column to logs table so per-user log queries can use an
+index instead of scanning the details text
+"""
+import re
+import sqlite3
+import os
+
+DB_PATH = os.path.join('db', 'cloud.db')
+
+def migrate_database():
+    """Add user_id column to logs table and backfill from details"""
+    print("Starting database migration...")
+
+    if not os.path.exists(DB_PATH):
+        print(f"Error: Database not found at {DB_PATH}")
+        print("Please run init_db.py first")
+        return False
+
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+
+        # Check if column already exists
+        cursor.execute("PRAGMA table_info(logs)")
+        columns = [row[1] for row in cursor.fetchall()]
+
+        if 'user_id' not in columns:
+            print("Adding 'user_id' column to logs table...")
+            cursor.execute("""
+                ALTER TABLE logs
+                ADD COLUMN user_id INTEGER
+            """)
+        else:
+            print("✓ Column 'user_id' already exists in logs table")
+
+        # Backfill from the 'user N' convention used in existing details text
+        print("Backfilling user_id from details text...")
+        cursor.execute("""
+            SELECT id, details FROM logs
+            WHERE user_id IS NULL AND details LIKE '%user %'
+        """)
+        updates = []
+        for row_id, details in cursor.fetchall():
+            match = re.search(r'\buser (\d+)\b', details)
+            if match:
+                updates.append((int(match.group(1)), row_id))
+        if updates:
+            cursor.executemany("UPDATE logs SET user_id = ? WHERE id = ?", updates)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_logs_user_action_ts
+            ON logs(user_id, action, timestamp)
+        """)
+
+        conn.commit()
+        print("✓ Migration completed successfully!")
+        print(f"  - Added 'user_id' column to logs table")
+        print(f"  - Backfilled {len(updates)} existing log entries")
+        print("  - Created index idx_logs_user_action_ts")
+
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    success = migrate_database()
+    if success:
+        print("\n✓ Database is ready for indexed per-user log queries!")
+    else:
+        print("\n✗ Migration failed. Please check the error above.")
@@ -1,10 +1,11 @@
 """
 Main Flask application for Secure Cloud Deduplication System
 """
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, session, Response, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
 import os
+import threading
 import time
 from datetime import datetime
 
@@ -16,7 +17,7 @@ from backend.pow_manager import ProofOfWorkManager
 from backend.ownership_manager import OwnershipManager
 from backend.block_level_dedup import BlockLevelDedup
 from backend.performance_monitor import PerformanceMonitor
-from backend.encryption import decrypt_file
+from backend.encryption import decrypt_file_stream, get_file_hash, get_stream_hash
 
 # Import cloud simulator
 from cloud_simulator.optimized_bloom_filter import OptimizedBloomFilter
@@ -26,13 +27,14 @@ from cloud_simulator.cloud_storage import CloudStorageSimulator
 
 # Import database utilities
 from database.db_manager import DatabaseManager
-from database.cache_manager import get_hash_cache
+from database.cache_manager import get_hash_cache, CacheManager
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = Config.SQLALCHEMY_TRACK_MODIFICATIONS
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = Config.SQLALCHEMY_ENGINE_OPTIONS
 app.config['MAX_CONTENT_LENGTH'] = Config.MAX_UPLOAD_SIZE
 
 # Initialize database
@@ -51,6 +53,42 @@ ownership_manager = None
 performance_monitor = None
 cloud_simulator = None
 
+# Short-TTL cache for homepage stats; the aggregation queries behind them
+# are read-heavy and repeated on every render
+stats_cache = CacheManager(max_size=256, ttl=60)
+
+# Retained duplicate-check copies older than this are abandoned (the
+# session checked but never uploaded) and get swept
+CHECK_COPY_MAX_AGE = 3600
+
+
+def _discard_retained_check_copy():
+    """Remove the duplicate-check copy retained for this session, if any"""
+    checked = session.pop('duplicate_check', None)
+    if checked and checked.get('temp_path'):
+        try:
+            os.remove(checked['temp_path'])
+        except FileNotFoundError:
+            pass
+
+
+def _sweep_stale_check_copies():
+    """Delete retained check_* copies whose session never uploaded them"""
+    cutoff = time.time() - CHECK_COPY_MAX_AGE
+    try:
+        names = os.listdir(Config.TEMP_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if not name.startswith('check_'):
+            continue
+        path = os.path.join(Config.TEMP_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -78,15 +116,32 @@ def init_components():
     cloud_simulator = CloudStorageSimulator()
 
 
+def save_bloom_filter_async():
+    """Persist the Bloom filter state off the request critical path"""
+    def _save():
+        with app.app_context():
+            bloom_filter.save_to_db()
+
+    threading.Thread(target=_save, daemon=True).start()
+
+
 @app.route('/')
 def index():
     """Homepage"""
     if current_user.is_authenticated:
-        # Get user stats
-        user_stats = ownership_manager.get_ownership_stats(current_user.id)
-        system_stats = performance_monitor.get_system_overview()
-        
-        return render_template('index.html', 
+        # Get user stats (cached briefly to avoid re-running the aggregations)
+        user_stats_key = f"user_stats:{current_user.id}"
+        user_stats = stats_cache.get(user_stats_key)
+        if user_stats is None:
+            user_stats = ownership_manager.get_ownership_stats(current_user.id)
+            stats_cache.set(user_stats_key, user_stats)
+
+        system_stats = stats_cache.get('system_stats')
+        if system_stats is None:
+            system_stats = performance_monitor.get_system_overview()
+            stats_cache.set('system_stats', system_stats)
+
+        return render_template('index.html',
                              user_stats=user_stats,
                              system_stats=system_stats)
     return render_template('index.html')
@@ -160,6 +215,7 @@ def login():
 @login_required
 def logout():
     """User logout"""
+    _discard_retained_check_copy()
     logout_user()
     flash('Logged out successfully', 'success')
     return redirect(url_for('index'))
@@ -182,16 +238,34 @@ def upload():
         
         if file:
             filename = secure_filename(file.filename)
-            
+
             # Save to temp directory
             temp_path = os.path.join(Config.TEMP_DIR, filename)
-            file.save(temp_path)
-            
-            # Calculate file hash and metadata
-            file_hash = get_file_hash(temp_path)
-            file_size = os.path.getsize(temp_path)
-            file_type = filename.split('.')[-1] if '.' in filename else 'unknown'
-            
+
+            # Reuse the copy retained by /api/check_duplicate (if any) so the
+            # same bytes are not written to disk a second time. A matching
+            # filename is not enough — the file may have changed between the
+            # check and the upload — so reuse only when the posted bytes
+            # hash to what the check saw
+            checked = session.pop('duplicate_check', None)
+            known_hash = None
+            reused = False
+            if (checked and checked.get('filename') == filename
+                    and os.path.exists(checked.get('temp_path', ''))):
+                posted_hash = get_stream_hash(file.stream)
+                if posted_hash == checked.get('file_hash'):
+                    os.replace(checked['temp_path'], temp_path)
+                    known_hash = posted_hash
+                    reused = True
+                else:
+                    # Stale copy: the content changed since the check
+                    try:
+                        os.remove(checked['temp_path'])
+                    except FileNotFoundError:
+                        pass
+            if not reused:
+                file.save(temp_path)
+
             # Check if this is a forced upload (user clicked "Store Anyway")
             force_upload = request.form.get('force_upload', 'false') == 'true'
             
@@ -205,11 +279,12 @@ def upload():
             # Process file with deduplication
             use_optimized = request.form.get('use_optimized', 'false') == 'true'
             result = dedup_manager.process_file(
-                temp_path, 
-                filename, 
-                current_user.id, 
+                temp_path,
+                filename,
+                current_user.id,
                 use_optimized=use_optimized,
-                prefer_s3=prefer_s3
+                prefer_s3=prefer_s3,
+                file_hash=known_hash
             )
             
             if result['success']:
@@ -225,9 +300,16 @@ def upload():
                     storage_msg = "in AWS S3" if result.get('stored_in_cloud') else "locally"
                     flash(f'File uploaded successfully {storage_msg}! Processing time: {result["processing_time"]:.2f}s', 'success')
                 
-                # Save Bloom filter state
-                bloom_filter.save_to_db()
-                
+                # The upload changed the numbers behind the homepage stats;
+                # drop the cached entries so the next render is current
+                # instead of waiting out the TTL
+                stats_cache.delete(f"user_stats:{current_user.id}")
+                stats_cache.delete('system_stats')
+
+                # Save Bloom filter state in the background; the compress +
+                # write does not need to block the upload response
+                save_bloom_filter_async()
+
                 return redirect(url_for('files'))
             else:
                 flash('Upload failed', 'error')
@@ -247,6 +329,9 @@ def check_duplicate():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
+        # Opportunistic TTL sweep of copies abandoned by other sessions
+        _sweep_stale_check_copies()
+
         # Save to temp directory
         filename = secure_filename(file.filename)
         temp_path = os.path.join(Config.TEMP_DIR, f"check_{current_user.id}_{filename}")
@@ -261,11 +346,23 @@ def check_duplicate():
         result = dedup_manager.check_duplicate_with_details(
             file_hash, filename, file_size, file_type
         )
-        
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
+
+        # Retain the temp copy so a follow-up /upload can reuse it instead
+        # of uploading and writing the same file again; drop any previously
+        # retained copy for this session first
+        previous = session.get('duplicate_check')
+        if previous and previous.get('temp_path') and previous['temp_path'] != temp_path:
+            try:
+                os.remove(previous['temp_path'])
+            except FileNotFoundError:
+                pass
+
+        session['duplicate_check'] = {
+            'filename': filename,
+            'temp_path': temp_path,
+            'file_hash': file_hash
+        }
+
         if result['is_duplicate'] and result['similar_files']:
             similar_file_data = result['similar_files'][0]  # Get most similar
             existing_file = similar_file_data['file']
@@ -385,26 +482,39 @@ def download(file_id):
         return redirect(url_for('files'))
     
     file = File.query.get_or_404(file_id)
-    
-    # Decrypt file to temp location
-    temp_output = os.path.join(Config.TEMP_DIR, f"download_{file.id}_{file.file_name}")
-    
+
     if file.is_in_cloud:
         # Download from cloud first
         from backend.cloud_utils import download_from_s3
         cloud_temp = os.path.join(Config.TEMP_DIR, f"cloud_{file.id}")
         object_name = os.path.basename(file.cloud_path)
-        
-        if download_from_s3(object_name, cloud_temp):
-            decrypt_file(cloud_temp, temp_output)
-            os.remove(cloud_temp)
-        else:
+
+        if not download_from_s3(object_name, cloud_temp):
             flash('Failed to download from cloud', 'error')
             return redirect(url_for('files'))
+
+        source_path = cloud_temp
+        cleanup_source = True
     else:
-        decrypt_file(file.stored_path, temp_output)
-    
-    return send_file(temp_output, as_attachment=True, download_name=file.file_name)
+        source_path = file.stored_path
+        cleanup_source = False
+
+    def generate():
+        """Stream decrypted chunks straight to the response"""
+        try:
+            yield from decrypt_file_stream(source_path)
+        finally:
+            if cleanup_source:
+                try:
+                    os.remove(source_path)
+                except FileNotFoundError:
+                    pass
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/octet-stream',
+        headers={'Content-Disposition': f'attachment; filename="{file.file_name}"'}
+    )
 
 
 if __name__ == '__main__':
@@ -4,7 +4,8 @@ Supports both fixed-size and variable-size chunking
 """
 import os
 import hashlib
-from .models import db, Block, File
+import concurrent.futures
+from .models import db, Block, File, SystemStats
 from .encryption import encrypt_data, decrypt_data
 from .config import Config
 
@@ -22,7 +23,24 @@ class BlockLevelDedup:
         """
         self.block_size = block_size or Config.BLOCK_SIZE
         self.use_variable = use_variable if use_variable is not None else Config.USE_VARIABLE_BLOCKS
-    
+
+    def chunk_file(self, file_path):
+        """
+        Chunk file using the configured strategy
+
+        Dispatches once on use_variable so callers hit the specialized
+        fixed-block path directly when USE_VARIABLE_BLOCKS is off.
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            List of (block_data, block_hash) tuples
+        """
+        if self.use_variable:
+            return self.chunk_file_variable(file_path)
+        return self.chunk_file_fixed(file_path)
+
     def chunk_file_fixed(self, file_path):
         """
         Chunk file into fixed-size blocks
@@ -34,16 +52,26 @@ class BlockLevelDedup:
             List of (block_data, block_hash) tuples
         """
         blocks = []
-        
+
+        # Read into one preallocated buffer instead of allocating a fresh
+        # bytes object per read; only the final block snapshot is copied
+        buf = bytearray(self.block_size)
+        view = memoryview(buf)
+
+        # Hoist the hasher constructor and append out of the loop
+        sha256 = hashlib.sha256
+        append = blocks.append
+
         with open(file_path, 'rb') as f:
+            readinto = f.readinto
             while True:
-                block_data = f.read(self.block_size)
-                if not block_data:
+                bytes_read = readinto(buf)
+                if not bytes_read:
                     break
-                
-                block_hash = hashlib.sha256(block_data).hexdigest()
-                blocks.append((block_data, block_hash))
-        
+
+                block_data = bytes(view[:bytes_read])
+                append((block_data, sha256(block_data).hexdigest()))
+
         return blocks
     
     def chunk_file_variable(self, file_path, window_size=48):
@@ -98,38 +126,64 @@ class BlockLevelDedup:
         blocks_stored = 0
         blocks_deduplicated = 0
         bytes_saved = 0
-        
+
+        # Partition into existing vs. new blocks (DB lookups stay single-threaded)
+        new_blocks = {}
         for block_data, block_hash in blocks:
-            # Check if block already exists
+            if block_hash in new_blocks:
+                # Same new block repeated within this file
+                new_blocks[block_hash]['reference_count'] += 1
+                blocks_deduplicated += 1
+                bytes_saved += len(block_data)
+                continue
+
             existing_block = Block.query.filter_by(block_hash=block_hash).first()
-            
+
             if existing_block:
                 # Block exists, just increment reference count
                 existing_block.reference_count += 1
                 blocks_deduplicated += 1
                 bytes_saved += len(block_data)
             else:
-                # New block, store it
-                block_path = os.path.join(Config.BLOCKS_DIR, f"{block_hash}.blk")
-                
-                # Encrypt block data
-                encrypted_data = encrypt_data(block_data)
-                
-                with open(block_path, 'wb') as f:
-                    f.write(encrypted_data)
-                
-                # Create block record
-                new_block = Block(
-                    block_hash=block_hash,
-                    block_size=len(block_data),
-                    stored_path=block_path,
-                    file_id=file_id,
-                    reference_count=1
-                )
-                
-                db.session.add(new_block)
-                blocks_stored += 1
-        
+                new_blocks[block_hash] = {'data': block_data, 'reference_count': 1}
+
+        def _encrypt_and_write(item):
+            """Encrypt a new block and write it to disk"""
+            block_hash, entry = item
+            block_path = os.path.join(Config.BLOCKS_DIR, f"{block_hash}.blk")
+
+            # Encrypt block data
+            encrypted_data = encrypt_data(entry['data'])
+
+            with open(block_path, 'wb') as f:
+                f.write(encrypted_data)
+
+            return block_hash, entry, block_path
+
+        # Encrypt + write new blocks in parallel; cryptography's C code and
+        # file I/O both release the GIL, so this scales with workers
+        if new_blocks:
+            new_block_records = []
+            with concurrent.futures.ThreadPoolExecutor(max_workers=Config.PARALLEL_WORKERS) as executor:
+                for block_hash, entry, block_path in executor.map(_encrypt_and_write, new_blocks.items()):
+                    # Create block record (DB accumulation stays single-threaded)
+                    new_block_records.append(Block(
+                        block_hash=block_hash,
+                        block_size=len(entry['data']),
+                        stored_path=block_path,
+                        file_id=file_id,
+                        reference_count=entry['reference_count']
+                    ))
+                    blocks_stored += 1
+
+            # Bulk insert skips per-object identity bookkeeping
+            db.session.bulk_save_objects(new_block_records)
+            # bulk_save_objects bypasses mapper events, so bump the
+            # materialized counters directly in the same transaction
+            SystemStats.increment(
+                db.session.connection(), block_count=len(new_block_records)
+            )
+
         db.session.commit()
         
         # Update file record
@@ -143,7 +197,7 @@ class BlockLevelDedup:
             'new_blocks': blocks_stored,
             'deduplicated_blocks': blocks_deduplicated,
             'bytes_saved': bytes_saved,
-            'dedup_ratio': (bytes_saved / sum([len(b[0]) for b in blocks])) * 100 if blocks else 0
+            'dedup_ratio': (bytes_saved / sum(len(b[0]) for b in blocks)) * 100 if blocks else 0
         }
     
     def reconstruct_file(self, file_id, output_path):
@@ -168,19 +222,20 @@ class BlockLevelDedup:
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
         
-        # Reconstruct file
+        def _read_and_decrypt(block):
+            """Read an encrypted block from disk and decrypt it"""
+            with open(block.stored_path, 'rb') as f:
+                encrypted_data = f.read()
+
+            return decrypt_data(encrypted_data)
+
+        # Read + decrypt blocks on a thread pool so disk reads overlap with
+        # decryption; executor.map preserves block order for the writer
         with open(output_path, 'wb') as out_file:
-            for block in blocks:
-                # Read encrypted block
-                with open(block.stored_path, 'rb') as f:
-                    encrypted_data = f.read()
-                
-                # Decrypt block
-                decrypted_data = decrypt_data(encrypted_data)
-                
-                # Write to output
-                out_file.write(decrypted_data)
-        
+            with concurrent.futures.ThreadPoolExecutor(max_workers=Config.PARALLEL_WORKERS) as executor:
+                for decrypted_data in executor.map(_read_and_decrypt, blocks):
+                    out_file.write(decrypted_data)
+
         return True
     
     def get_block_stats(self):
@@ -192,13 +247,10 @@ class BlockLevelDedup:
         
         total_size = db.session.query(db.func.sum(Block.block_size)).scalar() or 0
         
-        # Calculate space saved
-        space_saved = 0
-        if total_blocks > 0:
-            blocks = Block.query.all()
-            for block in blocks:
-                if block.reference_count > 1:
-                    space_saved += block.block_size * (block.reference_count - 1)
+        # Calculate space saved in SQL instead of iterating every block row
+        space_saved = db.session.query(
+            db.func.sum(Block.block_size * (Block.reference_count - 1))
+        ).filter(Block.reference_count > 1).scalar() or 0
         
         return {
             'total_unique_blocks': total_blocks,
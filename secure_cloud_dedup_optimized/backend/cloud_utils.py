@@ -8,6 +8,29 @@ from .config import Config
 # S3 Client Lazy-Loader
 _s3_client_instance = None
 
+# Transfer config lazy-loader: multipart parts uploaded concurrently
+# instead of one serial PUT of the whole buffered object
+_transfer_config_instance = None
+
+
+def get_transfer_config():
+    """Lazy-load the shared multipart transfer configuration"""
+    global _transfer_config_instance
+
+    if _transfer_config_instance is None:
+        from boto3.s3.transfer import TransferConfig
+        _transfer_config_instance = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            # A single S3 stream tops out around 45-90 MB/s, so well over
+            # ten concurrent byte-range parts are needed to saturate the
+            # link; keep at least 16 even when PARALLEL_WORKERS is lower
+            max_concurrency=max(Config.PARALLEL_WORKERS, 16),
+            use_threads=True,
+        )
+
+    return _transfer_config_instance
+
 
 def get_s3_client():
     """Lazy-load and return the S3 client"""
@@ -19,11 +42,16 @@ def get_s3_client():
     if _s3_client_instance is None:
         try:
             import boto3
+            from botocore.config import Config as BotoConfig
             _s3_client_instance = boto3.client(
                 's3',
                 aws_access_key_id=Config.AWS_ACCESS_KEY,
                 aws_secret_access_key=Config.AWS_SECRET_KEY,
-                region_name=Config.AWS_REGION
+                region_name=Config.AWS_REGION,
+                # Default keep-alive pool is 10 connections; bulk
+                # transfers fan out wider than that, so raise the cap to
+                # keep parallel PUT/GET from queueing on the pool
+                config=BotoConfig(max_pool_connections=64)
             )
         except Exception as e:
             print(f"Failed to initialize S3 client: {e}")
@@ -48,7 +76,8 @@ def upload_to_s3(file_path, object_name):
         return False
     
     try:
-        s3.upload_file(file_path, Config.S3_BUCKET_NAME, object_name)
+        s3.upload_file(file_path, Config.S3_BUCKET_NAME, object_name,
+                       Config=get_transfer_config())
         return True
     except Exception as e:
         from botocore.exceptions import NoCredentialsError
@@ -77,7 +106,8 @@ def upload_fileobj_to_s3(file_obj, object_name):
     try:
         # Ensure file pointer is at the beginning
         file_obj.seek(0)
-        s3.upload_fileobj(file_obj, Config.S3_BUCKET_NAME, object_name)
+        s3.upload_fileobj(file_obj, Config.S3_BUCKET_NAME, object_name,
+                          Config=get_transfer_config())
         return True
     except Exception as e:
         from botocore.exceptions import NoCredentialsError
@@ -106,7 +136,8 @@ def download_from_s3(object_name, local_path):
     try:
         # Ensure directory exists
         os.makedirs(os.path.dirname(local_path), exist_ok=True)
-        s3.download_file(Config.S3_BUCKET_NAME, object_name, local_path)
+        s3.download_file(Config.S3_BUCKET_NAME, object_name, local_path,
+                         Config=get_transfer_config())
         return True
     except Exception as e:
         print(f"S3 Download Error: {e}")
@@ -21,6 +21,11 @@ class Config:
     DATABASE_PATH = os.path.join(BASE_DIR, 'database', 'database.db')
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{DATABASE_PATH}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 8,
+        'max_overflow': 4,
+        'pool_recycle': 3600,
+    }
     
     # Storage Directories
     STORAGE_DIR = os.path.join(BASE_DIR, 'storage')
@@ -1,13 +1,27 @@
 """
 Database models for the secure cloud deduplication system
 """
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Put SQLite in WAL mode so batched writes do not block readers"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
 class User(UserMixin, db.Model):
     """User model for authentication"""
     __tablename__ = 'users'
@@ -43,7 +57,9 @@ class File(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     file_name = db.Column(db.String(255), nullable=False)
     file_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
-    file_size = db.Column(db.Integer, nullable=False)
+    # BigInteger: a plain Integer overflows at 2 GB, well inside the range
+    # large-file dedup is meant to handle
+    file_size = db.Column(db.BigInteger, nullable=False)
     file_type = db.Column(db.String(50))
     stored_path = db.Column(db.String(500), nullable=False)
     is_encrypted = db.Column(db.Boolean, default=True)
@@ -63,7 +79,14 @@ class File(db.Model):
     uploads = db.relationship('Upload', backref='file', lazy='dynamic')
     blocks = db.relationship('Block', backref='file', lazy='dynamic')
     ownerships = db.relationship('Ownership', backref='file', lazy='dynamic')
-    
+
+    # Covering index for the metadata similarity scan: the candidate query
+    # filters on file_type and only reads the size and name columns, so the
+    # whole lookup is answered from the index
+    __table_args__ = (
+        db.Index('ix_files_type_size_name', 'file_type', 'file_size', 'file_name'),
+    )
+
     def __repr__(self):
         return f'<File {self.file_name}>'
 
@@ -89,13 +112,13 @@ class Block(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     block_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
-    block_size = db.Column(db.Integer, nullable=False)
+    block_size = db.Column(db.BigInteger, nullable=False)
     stored_path = db.Column(db.String(500), nullable=False)
     reference_count = db.Column(db.Integer, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    file_id = db.Column(db.Integer, db.ForeignKey('files.id'))
+    file_id = db.Column(db.Integer, db.ForeignKey('files.id'), index=True)
     
     def __repr__(self):
         return f'<Block {self.block_hash[:8]}...>'
@@ -112,7 +135,14 @@ class Ownership(db.Model):
     challenge_hash = db.Column(db.String(64))
     response_hash = db.Column(db.String(64))
     verification_method = db.Column(db.String(50), default='pow')
-    
+
+    # Composite unique index: verify_ownership and the duplicate guard in
+    # grant_ownership become one index probe, and duplicate grants are
+    # rejected by the database itself
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'file_id', name='uq_owner_user_file'),
+    )
+
     def __repr__(self):
         return f'<Ownership user={self.user_id} file={self.file_id}>'
 
@@ -125,8 +155,21 @@ class PerformanceMetric(db.Model):
     metric_type = db.Column(db.String(50), nullable=False)  # 'upload', 'dedup', 'encryption', etc.
     metric_value = db.Column(db.Float, nullable=False)
     metric_unit = db.Column(db.String(20))  # 'ms', 'bytes', 'ratio', etc.
+    # Promoted out of the metadata JSON so stats queries can filter on it
+    # without parsing JSON per row
+    method = db.Column(db.String(32), index=True)
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
-    metadata = db.Column(db.Text)  # JSON string for additional data
+    # Python attribute renamed: `metadata` is reserved by SQLAlchemy's
+    # declarative base; the DB column keeps its old name
+    extra_data = db.Column('metadata', db.Text)  # JSON string for additional data
+
+    # Every stats window filters on recorded_at, usually with metric_type;
+    # the composite index turns those scans into range lookups that also
+    # satisfy the ORDER BY recorded_at
+    __table_args__ = (
+        db.Index('ix_perf_type_time', 'metric_type', 'recorded_at'),
+        db.Index('ix_perf_recorded_at', 'recorded_at'),
+    )
     
     def __repr__(self):
         return f'<Metric {self.metric_type}={self.metric_value}{self.metric_unit}>'
@@ -163,6 +206,74 @@ class BloomFilterState(db.Model):
         return f'<BloomFilter items={self.item_count}>'
 
 
+class SystemStats(db.Model):
+    """Materialized system-wide counters (singleton row)
+
+    Running totals maintained on insert so the dashboard overview is one
+    primary-key read instead of COUNT(*) scans over every growing table.
+    The row is seeded lazily from exact table counts on first read, so
+    inserts that happen before seeding cannot cause drift.
+    """
+    __tablename__ = 'system_stats'
+
+    ROW_ID = 1
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_count = db.Column(db.BigInteger, nullable=False, default=0)
+    file_count = db.Column(db.BigInteger, nullable=False, default=0)
+    upload_count = db.Column(db.BigInteger, nullable=False, default=0)
+    block_count = db.Column(db.BigInteger, nullable=False, default=0)
+    total_storage_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def increment(cls, connection, **deltas):
+        """
+        Apply counter deltas with a single UPDATE on the singleton row
+
+        A no-op while the row does not exist yet; callers that bulk-insert
+        (which bypasses mapper events) use this directly.
+
+        Args:
+            connection: Active connection (e.g. from a mapper event)
+            **deltas: Column-name -> amount to add
+        """
+        stats = cls.__table__
+        connection.execute(
+            stats.update()
+            .where(stats.c.id == cls.ROW_ID)
+            .values(**{name: stats.c[name] + delta for name, delta in deltas.items()})
+        )
+
+    def __repr__(self):
+        return f'<SystemStats files={self.file_count} uploads={self.upload_count}>'
+
+
+# Keep the materialized counters in step with inserts. These fire inside
+# the same flush/transaction as the insert itself, so the counters never
+# disagree with committed data
+@event.listens_for(User, 'after_insert')
+def _stats_count_user(mapper, connection, target):
+    SystemStats.increment(connection, user_count=1)
+
+
+@event.listens_for(File, 'after_insert')
+def _stats_count_file(mapper, connection, target):
+    SystemStats.increment(
+        connection, file_count=1, total_storage_bytes=target.file_size or 0
+    )
+
+
+@event.listens_for(Upload, 'after_insert')
+def _stats_count_upload(mapper, connection, target):
+    SystemStats.increment(connection, upload_count=1)
+
+
+@event.listens_for(Block, 'after_insert')
+def _stats_count_block(mapper, connection, target):
+    SystemStats.increment(connection, block_count=1)
+
+
 class KEKTreeNode(db.Model):
     """KEK Tree node for key management"""
     __tablename__ = 'kek_tree_nodes'
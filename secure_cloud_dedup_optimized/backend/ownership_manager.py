@@ -1,6 +1,8 @@
 """
 Ownership management module
 """
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
 from .models import db, Ownership, File, User
 from datetime import datetime
 
@@ -24,26 +26,21 @@ class OwnershipManager:
         Returns:
             Ownership record
         """
-        # Check if ownership already exists
-        existing = Ownership.query.filter_by(
-            user_id=user_id,
-            file_id=file_id
-        ).first()
-        
-        if existing:
-            return existing
-        
-        # Create new ownership record
-        ownership = Ownership(
+        # INSERT OR IGNORE against the (user_id, file_id) unique index:
+        # no pre-SELECT, and a concurrent duplicate grant is a no-op
+        stmt = sqlite_insert(Ownership).values(
             user_id=user_id,
             file_id=file_id,
             verification_method=verification_method
-        )
-        
-        db.session.add(ownership)
+        ).on_conflict_do_nothing(index_elements=['user_id', 'file_id'])
+
+        db.session.execute(stmt)
         db.session.commit()
-        
-        return ownership
+
+        return Ownership.query.filter_by(
+            user_id=user_id,
+            file_id=file_id
+        ).first()
     
     def verify_ownership(self, user_id, file_id):
         """
@@ -63,21 +60,31 @@ class OwnershipManager:
         
         return ownership is not None
     
-    def get_user_files(self, user_id):
+    def get_user_files(self, user_id, limit=None, offset=None):
         """
-        Get all files owned by a user
-        
+        Get files owned by a user
+
         Args:
             user_id: User ID
-        
+            limit: Optional maximum number of files to return
+            offset: Optional number of files to skip (for paging)
+
         Returns:
             List of File objects
         """
-        ownerships = Ownership.query.filter_by(user_id=user_id).all()
-        file_ids = [o.file_id for o in ownerships]
-        files = File.query.filter(File.id.in_(file_ids)).all()
-        
-        return files
+        # One join instead of materializing the ID list in Python and
+        # issuing a second IN (...) query; ordered by id so pages are
+        # stable across requests
+        query = File.query.join(
+            Ownership, Ownership.file_id == File.id
+        ).filter(Ownership.user_id == user_id).order_by(File.id)
+
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+
+        return query.all()
     
     def get_file_owners(self, file_id):
         """
@@ -89,11 +96,9 @@ class OwnershipManager:
         Returns:
             List of User objects
         """
-        ownerships = Ownership.query.filter_by(file_id=file_id).all()
-        user_ids = [o.user_id for o in ownerships]
-        users = User.query.filter(User.id.in_(user_ids)).all()
-        
-        return users
+        return User.query.join(
+            Ownership, Ownership.user_id == User.id
+        ).filter(Ownership.file_id == file_id).all()
     
     def revoke_ownership(self, user_id, file_id):
         """
@@ -106,22 +111,24 @@ class OwnershipManager:
         Returns:
             bool: True if revoked successfully
         """
-        ownership = Ownership.query.filter_by(
+        # Bulk DELETE + UPDATE in one transaction, no row hydration
+        deleted = Ownership.query.filter_by(
             user_id=user_id,
             file_id=file_id
-        ).first()
-        
-        if ownership:
-            db.session.delete(ownership)
-            
-            # Update file reference count
-            file = File.query.get(file_id)
-            if file:
-                file.reference_count = max(0, file.reference_count - 1)
-            
+        ).delete(synchronize_session=False)
+
+        if deleted:
+            File.query.filter_by(id=file_id).update(
+                {File.reference_count: db.case(
+                    (File.reference_count > 0, File.reference_count - 1),
+                    else_=0
+                )},
+                synchronize_session=False
+            )
             db.session.commit()
             return True
-        
+
+        db.session.rollback()
         return False
     
     def share_file(self, owner_id, recipient_id, file_id):
@@ -142,16 +149,27 @@ class OwnershipManager:
                 'success': False,
                 'error': 'You do not own this file'
             }
-        
-        # Grant ownership to recipient
-        ownership = self.grant_ownership(recipient_id, file_id, verification_method='shared')
-        
-        # Update file reference count
-        file = File.query.get(file_id)
-        if file:
-            file.reference_count += 1
-            db.session.commit()
-        
+
+        # Grant + ref-count bump in one transaction with a single commit
+        # instead of committing the grant and the update separately
+        stmt = sqlite_insert(Ownership).values(
+            user_id=recipient_id,
+            file_id=file_id,
+            verification_method='shared'
+        ).on_conflict_do_nothing(index_elements=['user_id', 'file_id'])
+        db.session.execute(stmt)
+
+        File.query.filter_by(id=file_id).update(
+            {File.reference_count: File.reference_count + 1},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+        ownership = Ownership.query.filter_by(
+            user_id=recipient_id,
+            file_id=file_id
+        ).first()
+
         return {
             'success': True,
             'ownership_id': ownership.id
@@ -167,17 +185,24 @@ class OwnershipManager:
         Returns:
             dict with statistics
         """
-        ownerships = Ownership.query.filter_by(user_id=user_id).all()
-        
-        total_files = len(ownerships)
-        uploaded = len([o for o in ownerships if o.verification_method == 'upload'])
-        shared = len([o for o in ownerships if o.verification_method == 'shared'])
-        verified_pow = len([o for o in ownerships if o.verification_method == 'pow'])
-        
-        # Calculate total storage used
-        file_ids = [o.file_id for o in ownerships]
-        files = File.query.filter(File.id.in_(file_ids)).all()
-        total_size = sum([f.file_size for f in files])
+        # One grouped aggregate: the DB returns per-method counts and
+        # sizes without hydrating a row per ownership
+        rows = db.session.query(
+            Ownership.verification_method,
+            db.func.count(Ownership.id),
+            db.func.coalesce(db.func.sum(File.file_size), 0)
+        ).join(
+            File, File.id == Ownership.file_id
+        ).filter(
+            Ownership.user_id == user_id
+        ).group_by(Ownership.verification_method).all()
+
+        counts = {method: count for method, count, _ in rows}
+        total_files = sum(counts.values())
+        uploaded = counts.get('upload', 0)
+        shared = counts.get('shared', 0)
+        verified_pow = counts.get('pow', 0)
+        total_size = sum(size for _, _, size in rows)
         
         return {
             'total_files': total_files,
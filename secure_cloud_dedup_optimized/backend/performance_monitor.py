@@ -2,29 +2,44 @@
 Performance monitoring module
 Tracks and analyzes system performance metrics
 """
+import queue
+import threading
 import time
 from datetime import datetime, timedelta
+from flask import current_app
 from .models import db, PerformanceMetric
 import json
 
 
 class PerformanceMonitor:
     """Performance monitoring and analytics"""
-    
+
+    # Shared buffered-writer state: metrics are queued and flushed in
+    # batches by a daemon thread instead of paying a commit per metric
+    _metric_queue = queue.Queue()
+    _writer_started = False
+    _writer_lock = threading.Lock()
+    _FLUSH_BATCH = 50
+    _FLUSH_INTERVAL = 2.0  # seconds
+
     def __init__(self):
         """Initialize performance monitor"""
         self.current_metrics = {}
-    
+
     def record_metric(self, metric_type, value, unit='', metadata=None):
         """
         Record a performance metric
-        
+
+        Metrics recorded under an app context are queued and bulk-flushed
+        by a background thread, so the returned record has no id until the
+        flush lands. Without an app context the write stays synchronous.
+
         Args:
             metric_type: Type of metric (upload, dedup, encryption, etc.)
             value: Metric value
             unit: Unit of measurement
             metadata: Optional additional data (dict)
-        
+
         Returns:
             PerformanceMetric record
         """
@@ -32,34 +47,89 @@ class PerformanceMonitor:
             metric_type=metric_type,
             metric_value=value,
             metric_unit=unit,
-            metadata=json.dumps(metadata) if metadata else None
+            method=(metadata or {}).get('method'),
+            extra_data=json.dumps(metadata) if metadata else None
         )
-        
-        db.session.add(metric)
-        db.session.commit()
-        
+
+        try:
+            app = current_app._get_current_object()
+        except RuntimeError:
+            # No app context (scripts, shells): write synchronously
+            db.session.add(metric)
+            db.session.commit()
+            return metric
+
+        self._ensure_writer(app)
+        self._metric_queue.put(metric)
+
         return metric
+
+    @classmethod
+    def _ensure_writer(cls, app):
+        """Start the background metric writer once"""
+        if cls._writer_started:
+            return
+
+        with cls._writer_lock:
+            if cls._writer_started:
+                return
+
+            thread = threading.Thread(target=cls._writer_loop, args=(app,), daemon=True)
+            thread.start()
+            cls._writer_started = True
+
+    @classmethod
+    def _writer_loop(cls, app):
+        """Drain queued metrics and bulk-insert them in batches"""
+        while True:
+            batch = [cls._metric_queue.get()]
+            deadline = time.time() + cls._FLUSH_INTERVAL
+
+            while len(batch) < cls._FLUSH_BATCH:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(cls._metric_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            with app.app_context():
+                db.session.bulk_save_objects(batch)
+                db.session.commit()
     
-    def get_metrics(self, metric_type=None, hours=24):
+    def get_metrics(self, metric_type=None, hours=24, lightweight=False):
         """
         Get performance metrics
-        
+
         Args:
             metric_type: Optional filter by metric type
             hours: Number of hours to look back
-        
+            lightweight: Return (metric_type, metric_value, metric_unit,
+                recorded_at) tuples instead of ORM objects, skipping
+                identity-map bookkeeping and change tracking for
+                read-only consumers like the dashboard
+
         Returns:
-            List of metrics
+            List of metrics (ORM objects, or tuples when lightweight)
         """
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        
+
         query = PerformanceMetric.query.filter(
             PerformanceMetric.recorded_at >= cutoff_time
         )
-        
+
         if metric_type:
             query = query.filter_by(metric_type=metric_type)
-        
+
+        if lightweight:
+            query = query.with_entities(
+                PerformanceMetric.metric_type,
+                PerformanceMetric.metric_value,
+                PerformanceMetric.metric_unit,
+                PerformanceMetric.recorded_at
+            )
+
         return query.order_by(PerformanceMetric.recorded_at.desc()).all()
     
     def get_average_metric(self, metric_type, hours=24):
@@ -73,98 +143,163 @@ class PerformanceMonitor:
         Returns:
             Average value
         """
-        metrics = self.get_metrics(metric_type, hours)
-        
-        if not metrics:
-            return 0
-        
-        total = sum([m.metric_value for m in metrics])
-        return total / len(metrics)
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+
+        # AVG computed by the database; no row hydration
+        average = db.session.query(
+            db.func.avg(PerformanceMetric.metric_value)
+        ).filter(
+            PerformanceMetric.recorded_at >= cutoff_time,
+            PerformanceMetric.metric_type == metric_type
+        ).scalar()
+
+        return average or 0
     
     def get_upload_stats(self, hours=24):
         """Get upload performance statistics"""
         from .models import Upload
         
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        
-        uploads = Upload.query.filter(
-            Upload.upload_date >= cutoff_time
-        ).all()
-        
-        if not uploads:
+
+        # One aggregate query: COUNT, total time and the duplicate count
+        # come back as a single row instead of hydrating every upload
+        total, total_time, duplicates = db.session.query(
+            db.func.count(Upload.id),
+            db.func.coalesce(db.func.sum(Upload.upload_time_ms), 0),
+            db.func.coalesce(
+                db.func.sum(db.case((Upload.was_duplicate == True, 1), else_=0)), 0
+            )
+        ).filter(Upload.upload_date >= cutoff_time).one()
+
+        if not total:
             return {
                 'total_uploads': 0,
                 'average_time_ms': 0,
                 'duplicates': 0,
                 'unique_files': 0
             }
-        
-        total_time = sum([u.upload_time_ms for u in uploads if u.upload_time_ms])
-        duplicates = len([u for u in uploads if u.was_duplicate])
-        
+
         return {
-            'total_uploads': len(uploads),
-            'average_time_ms': total_time / len(uploads) if uploads else 0,
+            'total_uploads': total,
+            'average_time_ms': total_time / total,
             'duplicates': duplicates,
-            'unique_files': len(uploads) - duplicates,
-            'dedup_rate': (duplicates / len(uploads)) * 100 if uploads else 0
+            'unique_files': total - duplicates,
+            'dedup_rate': (duplicates / total) * 100
         }
     
     def get_encryption_stats(self, hours=24):
         """Get encryption performance statistics"""
-        metrics = self.get_metrics('encryption', hours)
-        
-        if not metrics:
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+
+        # The dedicated indexed method column covers new rows; rows
+        # written before the column existed fall back to json_extract on
+        # the metadata blob, so no Python-side JSON parsing either way
+        method = db.func.coalesce(
+            PerformanceMetric.method,
+            db.func.json_extract(PerformanceMetric.extra_data, '$.method')
+        )
+        is_optimized = method == 'optimized_convergent'
+        is_traditional = db.and_(
+            db.or_(
+                PerformanceMetric.method.isnot(None),
+                PerformanceMetric.extra_data.isnot(None)
+            ),
+            db.or_(method.is_(None), method != 'optimized_convergent')
+        )
+
+        (total, total_time,
+         opt_count, opt_time,
+         trad_count, trad_time) = db.session.query(
+            db.func.count(PerformanceMetric.id),
+            db.func.coalesce(db.func.sum(PerformanceMetric.metric_value), 0),
+            db.func.coalesce(db.func.sum(db.case((is_optimized, 1), else_=0)), 0),
+            db.func.coalesce(db.func.sum(db.case((is_optimized, PerformanceMetric.metric_value), else_=0)), 0),
+            db.func.coalesce(db.func.sum(db.case((is_traditional, 1), else_=0)), 0),
+            db.func.coalesce(db.func.sum(db.case((is_traditional, PerformanceMetric.metric_value), else_=0)), 0)
+        ).filter(
+            PerformanceMetric.recorded_at >= cutoff_time,
+            PerformanceMetric.metric_type == 'encryption'
+        ).one()
+
+        if not total:
             return {
                 'total_encryptions': 0,
                 'average_time': 0,
                 'optimized_count': 0,
                 'traditional_count': 0
             }
-        
-        optimized = []
-        traditional = []
-        
-        for metric in metrics:
-            if metric.metadata:
-                meta = json.loads(metric.metadata)
-                if meta.get('method') == 'optimized_convergent':
-                    optimized.append(metric.metric_value)
-                else:
-                    traditional.append(metric.metric_value)
-        
+
+        optimized_avg = opt_time / opt_count if opt_count else 0
+        traditional_avg = trad_time / trad_count if trad_count else 0
+
         return {
-            'total_encryptions': len(metrics),
-            'average_time': sum([m.metric_value for m in metrics]) / len(metrics),
-            'optimized_count': len(optimized),
-            'traditional_count': len(traditional),
-            'optimized_avg_time': sum(optimized) / len(optimized) if optimized else 0,
-            'traditional_avg_time': sum(traditional) / len(traditional) if traditional else 0,
-            'speedup': (sum(traditional) / len(traditional)) / (sum(optimized) / len(optimized)) if optimized and traditional else 1
+            'total_encryptions': total,
+            'average_time': total_time / total,
+            'optimized_count': opt_count,
+            'traditional_count': trad_count,
+            'optimized_avg_time': optimized_avg,
+            'traditional_avg_time': traditional_avg,
+            'speedup': traditional_avg / optimized_avg if opt_count and trad_count else 1
         }
     
     def get_dedup_stats(self, hours=24):
         """Get deduplication statistics"""
-        metrics = self.get_metrics('deduplication', hours)
-        
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+
+        total, duplicates = db.session.query(
+            db.func.count(PerformanceMetric.id),
+            db.func.coalesce(
+                db.func.sum(db.case((PerformanceMetric.metric_value == 1.0, 1), else_=0)), 0
+            )
+        ).filter(
+            PerformanceMetric.recorded_at >= cutoff_time,
+            PerformanceMetric.metric_type == 'deduplication'
+        ).one()
+
         return {
-            'total_dedup_checks': len(metrics),
-            'duplicates_found': len([m for m in metrics if m.metric_value == 1.0])
+            'total_dedup_checks': total,
+            'duplicates_found': duplicates
         }
     
+    def _seed_system_stats(self):
+        """Seed the singleton counter row from exact table counts"""
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        from .models import File, Upload, User, Block, SystemStats
+
+        # ON CONFLICT DO NOTHING: concurrent first reads race to seed and
+        # the loser keeps the winner's row
+        db.session.execute(
+            sqlite_insert(SystemStats.__table__).values(
+                id=SystemStats.ROW_ID,
+                user_count=User.query.count(),
+                file_count=File.query.count(),
+                upload_count=Upload.query.count(),
+                block_count=Block.query.count(),
+                total_storage_bytes=db.session.query(
+                    db.func.coalesce(db.func.sum(File.file_size), 0)
+                ).scalar()
+            ).on_conflict_do_nothing(index_elements=['id'])
+        )
+        db.session.commit()
+
+        return db.session.get(SystemStats, SystemStats.ROW_ID)
+
     def get_system_overview(self):
         """Get comprehensive system overview"""
-        from .models import File, Upload, User, Block
-        
-        # Overall stats
-        total_users = User.query.count()
-        total_files = File.query.count()
-        total_uploads = Upload.query.count()
-        total_blocks = Block.query.count()
-        
-        # Storage stats
-        total_storage = db.session.query(db.func.sum(File.file_size)).scalar() or 0
-        
+        from .models import SystemStats
+
+        # Materialized counters: one primary-key read instead of COUNT(*)
+        # scans; insert listeners keep the row current
+        stats = db.session.get(SystemStats, SystemStats.ROW_ID)
+        if stats is None:
+            stats = self._seed_system_stats()
+
+        total_users = stats.user_count
+        total_files = stats.file_count
+        total_uploads = stats.upload_count
+        total_blocks = stats.block_count
+        total_storage = stats.total_storage_bytes
+
         # Recent performance (last 24 hours)
         upload_stats = self.get_upload_stats(24)
         encryption_stats = self.get_encryption_stats(24)
@@ -182,17 +317,18 @@ class PerformanceMonitor:
     
     def get_realtime_metrics(self):
         """Get real-time metrics for dashboard"""
-        # Get metrics from last 5 minutes
-        recent_metrics = self.get_metrics(hours=0.083)  # 5 minutes
-        
+        # Get metrics from last 5 minutes; the dashboard only reads, so
+        # fetch plain tuples instead of tracked ORM objects
+        recent_metrics = self.get_metrics(hours=0.083, lightweight=True)  # 5 minutes
+
         metrics_by_type = {}
-        for metric in recent_metrics:
-            if metric.metric_type not in metrics_by_type:
-                metrics_by_type[metric.metric_type] = []
-            metrics_by_type[metric.metric_type].append({
-                'value': metric.metric_value,
-                'unit': metric.metric_unit,
-                'timestamp': metric.recorded_at.isoformat()
+        for metric_type, value, unit, recorded_at in recent_metrics:
+            if metric_type not in metrics_by_type:
+                metrics_by_type[metric_type] = []
+            metrics_by_type[metric_type].append({
+                'value': value,
+                'unit': unit,
+                'timestamp': recorded_at.isoformat()
             })
         
         return metrics_by_type
@@ -2,8 +2,13 @@
 Adaptive Proof of Work manager
 Dynamically adjusts difficulty based on system load and performance
 """
+import itertools
+import time
+from collections import deque
+
 from backend.pow_manager import ProofOfWorkManager
 from backend.models import db, PerformanceMetric
+from backend.config import Config
 from datetime import datetime, timedelta
 import json
 
@@ -22,27 +27,39 @@ class AdaptivePowManager(ProofOfWorkManager):
         super().__init__(difficulty, adaptive=True)
         self.load_threshold_high = 0.8  # 80% load
         self.load_threshold_low = 0.3   # 30% load
-        self.recent_solve_times = []
         self.max_history = 20
-    
+        self.recent_solve_times = deque(maxlen=self.max_history)
+        self._load_cache = (0.0, 0.0)  # (timestamp, load)
+        self._load_cache_ttl = 10.0  # seconds
+
     def get_system_load(self):
         """
         Estimate system load based on recent activity
-        
+
+        The COUNT(*) behind this runs at most once per TTL window; every
+        challenge generation in between reuses the cached value, which is
+        accurate enough for a 5-minute load signal.
+
         Returns:
             Load factor (0.0 to 1.0)
         """
+        now = time.time()
+        cached_at, cached_load = self._load_cache
+        if now - cached_at < self._load_cache_ttl:
+            return cached_load
+
         # Check recent uploads in last 5 minutes
         from backend.models import Upload
-        
+
         cutoff_time = datetime.utcnow() - timedelta(minutes=5)
         recent_uploads = Upload.query.filter(
             Upload.upload_date >= cutoff_time
         ).count()
-        
+
         # Normalize to 0-1 range (assume max 100 uploads per 5 min = high load)
         load = min(recent_uploads / 100.0, 1.0)
-        
+
+        self._load_cache = (now, load)
         return load
     
     def adapt_difficulty_by_load(self):
@@ -51,13 +68,13 @@ class AdaptivePowManager(ProofOfWorkManager):
         
         if load > self.load_threshold_high:
             # High load - decrease difficulty to reduce computation
-            if self.difficulty > self.POW_MIN_DIFFICULTY:
+            if self.difficulty > Config.POW_MIN_DIFFICULTY:
                 self.difficulty -= 1
                 print(f"High load ({load:.2f}): PoW difficulty decreased to {self.difficulty}")
         
         elif load < self.load_threshold_low:
             # Low load - increase difficulty for better security
-            if self.difficulty < self.POW_MAX_DIFFICULTY:
+            if self.difficulty < Config.POW_MAX_DIFFICULTY:
                 self.difficulty += 1
                 print(f"Low load ({load:.2f}): PoW difficulty increased to {self.difficulty}")
     
@@ -69,20 +86,18 @@ class AdaptivePowManager(ProofOfWorkManager):
             solve_time: Time taken to solve challenge (seconds)
         """
         self.recent_solve_times.append(solve_time)
-        
-        # Keep only recent history
-        if len(self.recent_solve_times) > self.max_history:
-            self.recent_solve_times = self.recent_solve_times[-self.max_history:]
-        
-        # Adapt based on solve times
+
+        # Adapt based on solve times (the deque evicts old entries itself)
         if len(self.recent_solve_times) >= 5:
-            avg_time = sum(self.recent_solve_times[-5:]) / 5
+            avg_time = sum(itertools.islice(
+                self.recent_solve_times, len(self.recent_solve_times) - 5, None
+            )) / 5
             
             # Target: 2-5 seconds
-            if avg_time < 2.0 and self.difficulty < self.POW_MAX_DIFFICULTY:
+            if avg_time < 2.0 and self.difficulty < Config.POW_MAX_DIFFICULTY:
                 self.difficulty += 1
                 print(f"Fast solves ({avg_time:.2f}s): PoW difficulty increased to {self.difficulty}")
-            elif avg_time > 5.0 and self.difficulty > self.POW_MIN_DIFFICULTY:
+            elif avg_time > 5.0 and self.difficulty > Config.POW_MIN_DIFFICULTY:
                 self.difficulty -= 1
                 print(f"Slow solves ({avg_time:.2f}s): PoW difficulty decreased to {self.difficulty}")
     
@@ -4,10 +4,36 @@ Probabilistic data structure for membership testing
 """
 import hashlib
 import math
+import struct
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=8192)
+def _derive_indices(item_key, hash_count, size):
+    """
+    Memoized Kirsch-Mitzenmacher index derivation
+
+    Module-level so the cache is shared and keyable; upload bursts probe
+    the same file hash repeatedly (check-duplicate then upload), turning
+    repeat derivations into a dict hit.
+    """
+    digest = hashlib.blake2b(item_key.encode(), digest_size=16).digest()
+    h1, h2 = struct.unpack('<QQ', digest)
+    # size is a power of two (enforced in __init__), so the modulo
+    # reduction is a single AND against size-1
+    mask = size - 1
+    return tuple((h1 + i * h2) & mask for i in range(hash_count))
 
 
 class BloomFilter:
-    """Basic Bloom filter for fast duplicate detection"""
+    """Basic Bloom filter for fast duplicate detection
+
+    Bits are stored in a packed NumPy uint8 bitmap (one bit per position)
+    addressed with shift/mask, giving C-speed storage and serialization
+    with no dependency beyond NumPy, which the project already requires.
+    """
     
     def __init__(self, size=None, hash_count=None, false_positive_rate=None):
         """
@@ -27,9 +53,18 @@ class BloomFilter:
             size = self._optimal_size(expected_elements, false_positive_rate)
             hash_count = self._optimal_hash_count(size, expected_elements)
         
-        self.size = size or Config.BLOOM_FILTER_SIZE
+        size = size or Config.BLOOM_FILTER_SIZE
+        # Round up to the next power of two so index reduction in
+        # _derive_indices is a bitwise AND instead of an integer modulo.
+        # Rounding only grows the array (at most 2x), so the false
+        # positive rate at a given item count can only improve
+        self.size = 1 << max(0, size - 1).bit_length()
+        self._mask = self.size - 1
         self.hash_count = hash_count or Config.BLOOM_FILTER_HASH_COUNT
-        self.bit_array = [0] * self.size
+        # Packed bitmap: one bit per position instead of one Python int
+        # (~28 bytes) per bit; the byte layout matches to_bytes, so
+        # serialization is a straight memory copy
+        self.bit_array = np.zeros((self.size + 7) // 8, dtype=np.uint8)
         self.item_count = 0
     
     def _optimal_size(self, n, p):
@@ -60,20 +95,23 @@ class BloomFilter:
         k = (m / n) * math.log(2)
         return int(k)
     
-    def _hash(self, item, seed):
+    def _indices(self, item):
         """
-        Generate hash for item with seed
-        
+        Derive all k bit positions via Kirsch-Mitzenmacher double hashing
+
+        Two 64-bit values from one 16-byte BLAKE2b digest generate every
+        index as (h1 + i*h2) mod m, which keeps the asymptotic
+        false-positive rate of k independent hashes at the cost of one
+        hash call plus k integer multiply-adds. Results are memoized for
+        repeated probes of the same item.
+
         Args:
             item: Item to hash
-            seed: Hash seed
-        
+
         Returns:
-            Hash value
+            Tuple of bit positions
         """
-        data = f"{item}:{seed}".encode()
-        hash_value = int(hashlib.sha256(data).hexdigest(), 16)
-        return hash_value % self.size
+        return _derive_indices(str(item), self.hash_count, self.size)
     
     def add(self, item):
         """
@@ -82,10 +120,9 @@ class BloomFilter:
         Args:
             item: Item to add
         """
-        for i in range(self.hash_count):
-            index = self._hash(item, i)
-            self.bit_array[index] = 1
-        
+        for index in self._indices(item):
+            self.bit_array[index >> 3] |= np.uint8(1 << (index & 7))
+
         self.item_count += 1
     
     def contains(self, item):
@@ -98,11 +135,10 @@ class BloomFilter:
         Returns:
             bool: True if item might be present (with false positive rate)
         """
-        for i in range(self.hash_count):
-            index = self._hash(item, i)
-            if self.bit_array[index] == 0:
+        for index in self._indices(item):
+            if not self.bit_array[index >> 3] & (1 << (index & 7)):
                 return False
-        
+
         return True
     
     def get_false_positive_rate(self):
@@ -127,9 +163,18 @@ class BloomFilter:
         except:
             return 0.0
     
+    def _bits_set(self):
+        """Count set bits in the packed bitmap"""
+        if hasattr(np, 'bitwise_count'):
+            # NumPy 2.x: per-byte popcount with no unpacked intermediate.
+            # Padding bits past size are never set (indices are < size),
+            # so counting whole bytes is exact
+            return int(np.bitwise_count(self.bit_array).sum())
+        return int(np.unpackbits(self.bit_array, bitorder='little')[:self.size].sum())
+
     def get_stats(self):
         """Get Bloom filter statistics"""
-        bits_set = sum(self.bit_array)
+        bits_set = self._bits_set()
         fill_ratio = bits_set / self.size if self.size > 0 else 0
         
         return {
@@ -143,58 +188,51 @@ class BloomFilter:
     
     def clear(self):
         """Clear the Bloom filter"""
-        self.bit_array = [0] * self.size
+        self.bit_array.fill(0)
         self.item_count = 0
-    
+
     def to_bytes(self):
         """
         Serialize Bloom filter to bytes
-        
+
         Returns:
             bytes representation
         """
-        # Convert bit array to bytes
-        byte_array = bytearray()
-        
-        for i in range(0, len(self.bit_array), 8):
-            byte = 0
-            for j in range(8):
-                if i + j < len(self.bit_array) and self.bit_array[i + j]:
-                    byte |= (1 << j)
-            byte_array.append(byte)
-        
-        return bytes(byte_array)
-    
+        # The packed bitmap already uses the serialized byte layout
+        # (bit j of byte i is position i*8+j), so this is one memory copy
+        return self.bit_array.tobytes()
+
+    def _load_bytes(self, data):
+        """Load a serialized bitmap into this filter and estimate items"""
+        buf = np.frombuffer(data, dtype=np.uint8)
+        length = min(len(buf), len(self.bit_array))
+        self.bit_array[:length] = buf[:length]
+
+        bits_set = self._bits_set()
+        if bits_set > 0:
+            # Estimate item count from fill ratio
+            # n ≈ -(m/k) * ln(1 - X/m)
+            # where X = bits_set
+            try:
+                self.item_count = int(
+                    -(self.size / self.hash_count) * math.log(1 - bits_set / self.size)
+                )
+            except:
+                self.item_count = 0
+
     @classmethod
     def from_bytes(cls, data, size, hash_count):
         """
         Deserialize Bloom filter from bytes
-        
+
         Args:
             data: Bytes data
             size: Bit array size
             hash_count: Number of hash functions
-        
+
         Returns:
             BloomFilter instance
         """
         bf = cls(size=size, hash_count=hash_count)
-        
-        # Convert bytes to bit array
-        for i, byte in enumerate(data):
-            for j in range(8):
-                if i * 8 + j < size:
-                    bf.bit_array[i * 8 + j] = 1 if (byte & (1 << j)) else 0
-        
-        # Count items (approximate)
-        bits_set = sum(bf.bit_array)
-        if bits_set > 0:
-            # Estimate item count from fill ratio
-            # n ≈ -(m/k) * ln(1 - X/m)
-            # where X = bits_set
-            try:
-                bf.item_count = int(-(size / hash_count) * math.log(1 - bits_set / size))
-            except:
-                bf.item_count = 0
-        
+        bf._load_bytes(data)
         return bf
@@ -4,10 +4,26 @@ Hierarchical key management for efficient key updates
 """
 import hashlib
 import os
+from collections import defaultdict
+from functools import lru_cache
+from sqlalchemy import text
 from backend.models import db, KEKTreeNode
 from datetime import datetime
 
 
+@lru_cache(maxsize=1)
+def _root_node_id():
+    """
+    Resolve the root node id once per process
+
+    The root's identity never changes after create_tree (only its key
+    hash does), so the lookup survives KEKTree re-instantiation;
+    create_tree clears the cache when it builds a new tree.
+    """
+    root = KEKTreeNode.query.filter_by(level=0).first()
+    return root.node_id if root else None
+
+
 class KEKTree:
     """Key Encryption Key tree for hierarchical key management"""
     
@@ -22,8 +38,16 @@ class KEKTree:
         self.root = None
     
     def _generate_key_hash(self, data):
-        """Generate key hash"""
-        return hashlib.sha256(data.encode() if isinstance(data, str) else data).hexdigest()
+        """Generate key hash
+
+        The hash only labels a node (the actual secret is the os.urandom
+        key material), so BLAKE2b is used: same 32-byte digest width as
+        SHA-256 but markedly faster in software, which matters when
+        create_tree hashes thousands of nodes.
+        """
+        return hashlib.blake2b(
+            data.encode() if isinstance(data, str) else data, digest_size=32
+        ).hexdigest()
     
     def _generate_node_id(self, level, index):
         """Generate unique node ID"""
@@ -55,48 +79,57 @@ class KEKTree:
             level=0,
             is_leaf=False
         )
-        
+
         db.session.add(root)
-        db.session.commit()
-        
+        # Flush (not commit) so the root row precedes its children inside
+        # the single transaction built below
+        db.session.flush()
+
         self.root = root
-        
-        # Create tree levels
-        current_level_nodes = [root]
-        
+
+        # Create tree levels; each level is accumulated as plain mappings
+        # and bulk-inserted in one executemany instead of one INSERT (and
+        # one commit) per node
+        current_level_ids = [root_id]
+
         for level in range(1, height):
-            next_level_nodes = []
+            next_level_ids = []
+            level_mappings = []
             node_index = 0
-            
-            for parent in current_level_nodes:
+
+            for parent_id in current_level_ids:
                 for i in range(self.branching_factor):
                     if level == height - 1 and node_index >= num_leaves:
                         break
-                    
+
                     node_id = self._generate_node_id(level, node_index)
                     node_key = os.urandom(32)
                     node_hash = self._generate_key_hash(node_key)
-                    
+
                     is_leaf = (level == height - 1)
-                    
-                    node = KEKTreeNode(
-                        node_id=node_id,
-                        parent_id=parent.node_id,
-                        key_hash=node_hash,
-                        level=level,
-                        is_leaf=is_leaf
-                    )
-                    
-                    db.session.add(node)
-                    next_level_nodes.append(node)
+
+                    level_mappings.append({
+                        'node_id': node_id,
+                        'parent_id': parent_id,
+                        'key_hash': node_hash,
+                        'level': level,
+                        'is_leaf': is_leaf
+                    })
+                    next_level_ids.append(node_id)
                     node_index += 1
-                
+
                 if level == height - 1 and node_index >= num_leaves:
                     break
-            
-            db.session.commit()
-            current_level_nodes = next_level_nodes
-        
+
+            db.session.bulk_insert_mappings(KEKTreeNode, level_mappings)
+            current_level_ids = next_level_ids
+
+        # One commit for the whole tree
+        db.session.commit()
+
+        # The cached root id (if any) belongs to the previous tree
+        _root_node_id.cache_clear()
+
         return root
     
     def update_key(self, node_id, new_key_hash):
@@ -110,24 +143,29 @@ class KEKTree:
         Returns:
             List of updated node IDs
         """
-        node = KEKTreeNode.query.filter_by(node_id=node_id).first()
-        
-        if not node:
+        # Resolve the whole ancestor chain in one recursive CTE instead
+        # of one SELECT (and one commit) per tree level
+        updated_nodes = db.session.execute(text(
+            "WITH RECURSIVE anc(id, pid) AS ("
+            "  SELECT node_id, parent_id FROM kek_tree_nodes WHERE node_id = :n"
+            "  UNION ALL"
+            "  SELECT k.node_id, k.parent_id FROM kek_tree_nodes k"
+            "  JOIN anc ON k.node_id = anc.pid"
+            ") SELECT id FROM anc"
+        ), {'n': node_id}).scalars().all()
+
+        if not updated_nodes:
             return []
-        
-        # Update node
-        node.key_hash = new_key_hash
-        node.updated_at = datetime.utcnow()
-        
-        updated_nodes = [node_id]
-        
-        # Propagate update to parent (if not root)
-        if node.parent_id:
-            parent_updates = self.update_key(node.parent_id, new_key_hash)
-            updated_nodes.extend(parent_updates)
-        
+
+        # One bulk UPDATE and one commit for the whole node-to-root path
+        KEKTreeNode.query.filter(
+            KEKTreeNode.node_id.in_(updated_nodes)
+        ).update(
+            {'key_hash': new_key_hash, 'updated_at': datetime.utcnow()},
+            synchronize_session=False
+        )
         db.session.commit()
-        
+
         return updated_nodes
     
     def get_path_to_root(self, node_id):
@@ -163,16 +201,16 @@ class KEKTree:
         Returns:
             List of node IDs
         """
-        nodes = [node_id]
-        
-        # Get all children
-        children = KEKTreeNode.query.filter_by(parent_id=node_id).all()
-        
-        for child in children:
-            subtree = self.get_subtree_nodes(child.node_id)
-            nodes.extend(subtree)
-        
-        return nodes
+        # One recursive CTE returns the whole subtree instead of one
+        # child query per visited node (classic N+1)
+        return db.session.execute(text(
+            "WITH RECURSIVE sub(id) AS ("
+            "  SELECT node_id FROM kek_tree_nodes WHERE node_id = :n"
+            "  UNION ALL"
+            "  SELECT k.node_id FROM kek_tree_nodes k"
+            "  JOIN sub ON k.parent_id = sub.id"
+            ") SELECT id FROM sub"
+        ), {'n': node_id}).scalars().all()
     
     def get_tree_stats(self):
         """Get KEK tree statistics"""
@@ -202,25 +240,37 @@ class KEKTree:
             String representation
         """
         if not self.root:
-            root = KEKTreeNode.query.filter_by(level=0).first()
+            root_id = _root_node_id()
+            root = (
+                KEKTreeNode.query.filter_by(node_id=root_id).first()
+                if root_id else None
+            )
             if not root:
                 return "Empty tree"
             self.root = root
-        
-        def _visualize_node(node, depth=0, prefix=""):
+
+        # Fetch every node once and group by parent in memory; the walk
+        # below then issues no queries instead of one per visited node
+        rows = KEKTreeNode.query.with_entities(
+            KEKTreeNode.node_id, KEKTreeNode.parent_id, KEKTreeNode.level
+        ).all()
+        children_of = defaultdict(list)
+        for row in rows:
+            children_of[row.parent_id].append(row)
+
+        def _visualize_node(node_id, level, depth=0, prefix=""):
             if depth > max_depth:
                 return ""
-            
-            result = f"{prefix}{node.node_id} (L{node.level})\n"
-            
-            children = KEKTreeNode.query.filter_by(parent_id=node.node_id).all()
-            
+
+            result = f"{prefix}{node_id} (L{level})\n"
+
+            children = children_of.get(node_id, [])
+
             for i, child in enumerate(children):
                 is_last = (i == len(children) - 1)
                 child_prefix = prefix + ("└── " if is_last else "├── ")
-                next_prefix = prefix + ("    " if is_last else "│   ")
-                result += _visualize_node(child, depth + 1, child_prefix)
-            
+                result += _visualize_node(child.node_id, child.level, depth + 1, child_prefix)
+
             return result
-        
-        return _visualize_node(self.root)
+
+        return _visualize_node(self.root.node_id, self.root.level)
@@ -2,17 +2,19 @@
 Lazy update strategy for KEK tree
 Defers key updates for better performance
 """
+import threading
+
 from datetime import datetime, timedelta
 from .kek_tree import KEKTree
 
 
 class LazyUpdateManager:
     """Lazy update strategy for efficient key management"""
-    
+
     def __init__(self, kek_tree, batch_size=10, update_interval_minutes=5):
         """
         Initialize lazy update manager
-        
+
         Args:
             kek_tree: KEKTree instance
             batch_size: Number of updates to batch
@@ -21,26 +23,67 @@ class LazyUpdateManager:
         self.kek_tree = kek_tree
         self.batch_size = batch_size
         self.update_interval = timedelta(minutes=update_interval_minutes)
-        self.pending_updates = []
+        # Keyed by node_id: re-keying the same node overwrites in place
+        # (latest wins), so memory and flush time scale with unique nodes
+        # rather than total enqueues
+        self.pending_updates = {}
         self.last_update_time = datetime.utcnow()
-    
+        self._wake = threading.Event()
+        self._flusher = None
+
+    def start_background_flush(self, app=None):
+        """
+        Start an event-driven background flusher
+
+        The flusher thread sleeps on an Event with the update interval as
+        timeout: a full batch wakes it immediately, an idle period flushes
+        on the interval, and no CPU is spent polling in between. With a
+        flusher running, queue_update stops flushing inline and only
+        signals the event.
+
+        Args:
+            app: Flask app whose context DB work should run under
+        """
+        if self._flusher is not None:
+            return
+
+        def _run():
+            while True:
+                self._wake.wait(timeout=self.update_interval.total_seconds())
+                self._wake.clear()
+                if not self.pending_updates:
+                    continue
+                if app is not None:
+                    with app.app_context():
+                        self.flush_updates()
+                else:
+                    self.flush_updates()
+
+        self._flusher = threading.Thread(target=_run, daemon=True)
+        self._flusher.start()
+
     def queue_update(self, node_id, new_key_hash):
         """
         Queue a key update
-        
+
         Args:
             node_id: Node ID to update
             new_key_hash: New key hash
         """
-        self.pending_updates.append({
+        self.pending_updates[node_id] = {
             'node_id': node_id,
             'key_hash': new_key_hash,
             'queued_at': datetime.utcnow()
-        })
-        
+        }
+
         # Check if we should flush
         if self._should_flush():
-            self.flush_updates()
+            if self._flusher is not None:
+                # Hand the work to the background flusher instead of
+                # paying the flush on the enqueue path
+                self._wake.set()
+            else:
+                self.flush_updates()
     
     def _should_flush(self):
         """Check if updates should be flushed"""
@@ -63,25 +106,18 @@ class LazyUpdateManager:
         """
         if not self.pending_updates:
             return 0
-        
-        # Group updates by node to avoid redundant updates
-        updates_by_node = {}
-        for update in self.pending_updates:
-            node_id = update['node_id']
-            # Keep only the latest update for each node
-            if node_id not in updates_by_node or update['queued_at'] > updates_by_node[node_id]['queued_at']:
-                updates_by_node[node_id] = update
-        
-        # Apply updates
+
+        # Already deduplicated at enqueue time (one entry per node,
+        # latest wins), so apply directly
         total_updated = 0
-        for update in updates_by_node.values():
+        for update in self.pending_updates.values():
             updated_nodes = self.kek_tree.update_key(update['node_id'], update['key_hash'])
             total_updated += len(updated_nodes)
-        
+
         # Clear pending updates
-        self.pending_updates = []
+        self.pending_updates = {}
         self.last_update_time = datetime.utcnow()
-        
+
         return total_updated
     
     def force_flush(self):
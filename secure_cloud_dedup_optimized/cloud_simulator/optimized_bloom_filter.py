@@ -5,19 +5,30 @@ Uses compression for better memory efficiency
 import zlib
 from .bloom_filter import BloomFilter
 
+# Version tag prepended to persisted blobs. Bump whenever the bit layout
+# or index derivation changes (bit packing, BLAKE2b double hashing,
+# power-of-two sizing): a blob written under another scheme decodes into
+# incompatible bit positions, and the resulting false negatives would
+# silently skip the database lookup in check_duplicate. Untagged or
+# mismatched state is discarded so startup rebuilds from the files table.
+STATE_FORMAT = b'OBF2'
+
 
 class OptimizedBloomFilter(BloomFilter):
     """Compressed Bloom filter with persistence support"""
     
-    def __init__(self, size=None, hash_count=None, false_positive_rate=None, compression_level=6):
+    def __init__(self, size=None, hash_count=None, false_positive_rate=None, compression_level=1):
         """
         Initialize optimized Bloom filter
-        
+
         Args:
             size: Size of bit array
             hash_count: Number of hash functions
             false_positive_rate: Desired false positive rate
-            compression_level: Zlib compression level (1-9)
+            compression_level: Zlib compression level (1-9). Defaults to 1:
+                sparse bitmaps are dominated by zero runs, which level 1
+                already collapses at a fraction of the CPU cost of higher
+                levels, and the filter is compressed on every state save
         """
         super().__init__(size, hash_count, false_positive_rate)
         self.compression_level = compression_level
@@ -47,24 +58,10 @@ class OptimizedBloomFilter(BloomFilter):
         Returns:
             OptimizedBloomFilter instance
         """
-        raw_data = zlib.decompress(compressed_data)
         bf = cls(size=size, hash_count=hash_count, compression_level=compression_level)
-        
-        # Convert bytes to bit array
-        for i, byte in enumerate(raw_data):
-            for j in range(8):
-                if i * 8 + j < size:
-                    bf.bit_array[i * 8 + j] = 1 if (byte & (1 << j)) else 0
-        
-        # Estimate item count
-        bits_set = sum(bf.bit_array)
-        if bits_set > 0:
-            try:
-                import math
-                bf.item_count = int(-(size / hash_count) * math.log(1 - bits_set / size))
-            except:
-                bf.item_count = 0
-        
+        # The filter stores bits packed, so rebuilding is one buffer copy
+        # in _load_bytes — no per-bit unpacking loop exists to vectorize
+        bf._load_bytes(zlib.decompress(compressed_data))
         return bf
     
     def save_to_db(self):
@@ -75,12 +72,12 @@ class OptimizedBloomFilter(BloomFilter):
             BloomFilterState record
         """
         from backend.models import db, BloomFilterState
-        
-        compressed_data = self.to_compressed_bytes()
-        
+
+        compressed_data = STATE_FORMAT + self.to_compressed_bytes()
+
         # Check if state exists
         state = BloomFilterState.query.first()
-        
+
         if state:
             # Update existing
             state.filter_data = compressed_data
@@ -108,15 +105,24 @@ class OptimizedBloomFilter(BloomFilter):
         Returns:
             OptimizedBloomFilter instance or None
         """
-        from backend.models import BloomFilterState
-        
+        from backend.models import db, BloomFilterState
+
         state = BloomFilterState.query.first()
-        
+
         if not state:
             return None
-        
+
+        data = state.filter_data
+        if not data.startswith(STATE_FORMAT):
+            # Saved under an older bit layout or index derivation; its
+            # positions no longer line up, so discard and let the caller
+            # rebuild from the files table
+            db.session.delete(state)
+            db.session.commit()
+            return None
+
         return cls.from_compressed_bytes(
-            state.filter_data,
+            data[len(STATE_FORMAT):],
             state.size,
             state.hash_count
         )
@@ -8,7 +8,13 @@ from backend.config import Config
 
 
 class CacheManager:
-    """In-memory LRU cache for performance optimization"""
+    """In-memory LRU cache for performance optimization
+
+    Hand-rolled rather than cachetools.TTLCache: the hot get/set path is
+    a single dict lookup either way, hit/miss accounting is built in,
+    and the only structural difference (heap-ordered expiry) matters for
+    the explicit cleanup_expired sweep, which is not on a request path.
+    """
     
     def __init__(self, max_size=None, ttl=None):
         """
@@ -20,44 +26,46 @@ class CacheManager:
         """
         self.max_size = max_size or Config.CACHE_MAX_SIZE
         self.ttl = ttl or Config.CACHE_TTL
+        # Single map of key -> (value, expiry) tuples: one lookup, one
+        # insert and one delete per operation instead of keeping a
+        # parallel timestamp dict in step
         self.cache = OrderedDict()
-        self.timestamps = {}
         self.hits = 0
         self.misses = 0
-    
+
     def get(self, key):
         """
         Get value from cache
-        
+
         Args:
             key: Cache key
-        
+
         Returns:
             Cached value or None
         """
-        if key not in self.cache:
+        entry = self.cache.get(key)
+
+        if entry is None:
             self.misses += 1
             return None
-        
-        # Check TTL
-        if key in self.timestamps:
-            age = time.time() - self.timestamps[key]
-            if age > self.ttl:
-                # Expired
-                del self.cache[key]
-                del self.timestamps[key]
-                self.misses += 1
-                return None
-        
+
+        value, expiry = entry
+
+        if time.time() > expiry:
+            # Expired
+            del self.cache[key]
+            self.misses += 1
+            return None
+
         # Move to end (most recently used)
         self.cache.move_to_end(key)
         self.hits += 1
-        return self.cache[key]
-    
+        return value
+
     def set(self, key, value):
         """
         Set value in cache
-        
+
         Args:
             key: Cache key
             value: Value to cache
@@ -65,72 +73,60 @@ class CacheManager:
         # Update existing key
         if key in self.cache:
             self.cache.move_to_end(key)
-        
-        self.cache[key] = value
-        self.timestamps[key] = time.time()
-        
+
+        self.cache[key] = (value, time.time() + self.ttl)
+
         # Evict oldest if over max size
         if len(self.cache) > self.max_size:
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
-            if oldest_key in self.timestamps:
-                del self.timestamps[oldest_key]
-    
+            self.cache.popitem(last=False)
+
     def delete(self, key):
         """
         Delete key from cache
-        
+
         Args:
             key: Cache key
         """
-        if key in self.cache:
-            del self.cache[key]
-        if key in self.timestamps:
-            del self.timestamps[key]
-    
+        self.cache.pop(key, None)
+
     def clear(self):
         """Clear all cache"""
         self.cache.clear()
-        self.timestamps.clear()
         self.hits = 0
         self.misses = 0
-    
+
     def exists(self, key):
         """
         Check if key exists in cache
-        
+
         Args:
             key: Cache key
-        
+
         Returns:
             bool: True if exists and not expired
         """
-        if key not in self.cache:
+        entry = self.cache.get(key)
+
+        if entry is None:
             return False
-        
-        # Check TTL
-        if key in self.timestamps:
-            age = time.time() - self.timestamps[key]
-            if age > self.ttl:
-                del self.cache[key]
-                del self.timestamps[key]
-                return False
-        
+
+        if time.time() > entry[1]:
+            del self.cache[key]
+            return False
+
         return True
-    
+
     def cleanup_expired(self):
         """Remove all expired entries"""
         current_time = time.time()
-        expired_keys = []
-        
-        for key, timestamp in self.timestamps.items():
-            if current_time - timestamp > self.ttl:
-                expired_keys.append(key)
-        
+        expired_keys = [
+            key for key, (_, expiry) in self.cache.items()
+            if current_time > expiry
+        ]
+
         for key in expired_keys:
             del self.cache[key]
-            del self.timestamps[key]
-        
+
         return len(expired_keys)
     
     def get_stats(self):
@@ -1,96 +1,167 @@
 """
 Database manager for connection pooling and operations
 """
+import queue
 import sqlite3
+import threading
 import os
+from contextlib import contextmanager
 from backend.config import Config
 
 
 class DatabaseManager:
-    """Database operations manager"""
-    
-    def __init__(self, db_path=None):
+    """Database operations manager with a pooled connection set"""
+
+    def __init__(self, db_path=None, pool_size=8):
         """
         Initialize database manager
-        
+
         Args:
             db_path: Path to database file
+            pool_size: Maximum number of pooled connections
         """
         self.db_path = db_path or Config.DATABASE_PATH
-        self._connection = None
-    
-    def get_connection(self):
-        """Get database connection"""
-        if self._connection is None:
-            self._connection = sqlite3.connect(self.db_path)
-            self._connection.row_factory = sqlite3.Row  # Enable column access by name
-        return self._connection
-    
-    def close_connection(self):
-        """Close database connection"""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
-    
+        self.pool_size = pool_size
+        # Connections are created lazily up to pool_size and recycled
+        # through the queue; concurrent callers each get their own
+        # connection instead of serializing on a single shared one
+        self._pool = queue.Queue(maxsize=pool_size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _new_connection(self):
+        """Create a configured connection"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        # WAL + NORMAL: commits stop fsyncing the whole journal per
+        # write and readers are no longer blocked by writers. The
+        # remaining pragmas keep temp structures and hot pages in
+        # memory instead of spilling to disk
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-65536')
+        return conn
+
+    def _acquire(self):
+        """Take a connection from the pool, growing it up to pool_size"""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                return self._new_connection()
+
+        # Pool is at capacity: wait for a connection to be returned
+        return self._pool.get()
+
+    @contextmanager
+    def connection(self):
+        """
+        Check a connection out of the pool for the duration of a block
+
+        Yields:
+            sqlite3.Connection
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            while True:
+                try:
+                    self._pool.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._created -= 1
+
     def execute_query(self, query, params=None):
         """
-        Execute a query
-        
+        Execute a query and return its rows
+
         Args:
             query: SQL query
             params: Query parameters
-        
+
         Returns:
-            Cursor object
+            List of sqlite3.Row results
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        conn.commit()
-        return cursor
-    
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+
+            conn.commit()
+            return cursor.fetchall()
+
+    def execute_many(self, query, seq_of_params):
+        """
+        Execute a query for a batch of parameter rows
+
+        One executemany plus one commit instead of a commit per row, so
+        bulk writers do not pay an fsync per record.
+
+        Args:
+            query: SQL query
+            seq_of_params: Iterable of parameter tuples
+
+        Returns:
+            Number of affected rows
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, seq_of_params)
+            conn.commit()
+            return cursor.rowcount
+
     def execute_script(self, script):
         """
         Execute SQL script
-        
+
         Args:
             script: SQL script
         """
-        conn = self.get_connection()
-        conn.executescript(script)
-        conn.commit()
-    
+        with self.connection() as conn:
+            conn.executescript(script)
+            conn.commit()
+
     def initialize_database(self):
         """Initialize database with schema"""
         schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
-        
+
         if os.path.exists(schema_path):
             with open(schema_path, 'r') as f:
                 schema = f.read()
-            
+
             self.execute_script(schema)
             print("Database initialized successfully")
         else:
             print(f"Schema file not found: {schema_path}")
-    
+
     def create_admin_user(self, username='admin', email='admin@example.com', password='admin123'):
         """
         Create default admin user
-        
+
         Args:
             username: Admin username
             email: Admin email
             password: Admin password
         """
         from werkzeug.security import generate_password_hash
-        
+
         password_hash = generate_password_hash(password)
-        
+
         try:
             self.execute_query(
                 "INSERT INTO users (username, email, password_hash, role) VALUES (?, ?, ?, ?)",
@@ -99,27 +170,30 @@ class DatabaseManager:
             print(f"Admin user created: {username}")
         except sqlite3.IntegrityError:
             print(f"Admin user already exists: {username}")
-    
+
     def get_stats(self):
         """Get database statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         stats = {}
-        
-        # Count records in each table
-        tables = ['users', 'files', 'uploads', 'blocks', 'ownerships', 
+
+        # Count records in each table with one UNION ALL statement: one
+        # parse, one execute and one fetch instead of a round-trip per table
+        tables = ['users', 'files', 'uploads', 'blocks', 'ownerships',
                   'performance_metrics', 'audit_logs', 'kek_tree_nodes']
-        
-        for table in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            count = cursor.fetchone()[0]
-            stats[table] = count
-        
+        count_sql = ' UNION ALL '.join(
+            f"SELECT '{table}' AS name, COUNT(*) AS count FROM {table}"
+            for table in tables
+        )
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(count_sql)
+            for name, count in cursor.fetchall():
+                stats[name] = count
+
         # Database file size
         if os.path.exists(self.db_path):
             stats['database_size_mb'] = os.path.getsize(self.db_path) / (1024 * 1024)
         else:
             stats['database_size_mb'] = 0
-        
+
         return stats
@@ -2,29 +2,39 @@
 Generate test data for deduplication testing
 """
 import os
+import shutil
 import sys
 import random
 import string
 
+import numpy as np
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.config import Config
 
+# Alphabet as a uint8 array so random content is generated by fancy
+# indexing in C rather than a Python loop per character
+_ALPHABET = np.frombuffer(
+    (string.ascii_letters + string.digits).encode('ascii'), dtype=np.uint8
+)
+
 
-def random_string(length):
-    """Generate random string"""
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+def random_bytes(length):
+    """Generate random ASCII content as bytes"""
+    indices = np.random.randint(0, _ALPHABET.size, length, dtype=np.int32)
+    return _ALPHABET[indices].tobytes()
 
 
 def create_test_file(directory, filename, size_kb):
     """Create a test file"""
     filepath = os.path.join(directory, filename)
-    
-    with open(filepath, 'w') as f:
-        # Write random content
-        content_size = size_kb * 1024
-        f.write(random_string(content_size))
-    
+
+    # Binary mode: the content is already ASCII bytes, so text mode would
+    # only add a UTF-8 encode pass over the whole payload
+    with open(filepath, 'wb') as f:
+        f.write(random_bytes(size_kb * 1024))
+
     return filepath
 
 
@@ -60,16 +70,16 @@ def generate_test_data():
     os.makedirs(dup_dir, exist_ok=True)
     
     # Create original
-    original_content = random_string(50 * 1024)
     original_path = os.path.join(dup_dir, 'original.txt')
-    with open(original_path, 'w') as f:
-        f.write(original_content)
-    
-    # Create duplicates
+    with open(original_path, 'wb') as f:
+        f.write(random_bytes(50 * 1024))
+
+    # Create duplicates by copying the original: shutil.copyfile uses
+    # zero-copy (sendfile/copy_file_range) on Linux, so the payload is
+    # not re-encoded through Python for every duplicate
     for i in range(5):
         dup_path = os.path.join(dup_dir, f'duplicate_{i}.txt')
-        with open(dup_path, 'w') as f:
-            f.write(original_content)
+        shutil.copyfile(original_path, dup_path)
     
     print(f"   ✓ Created 1 original + 5 duplicates in {dup_dir}")
     
@@ -23,6 +23,22 @@ def create_test_file(content, filename):
     return filepath
 
 
+def file_sha256(filepath):
+    """Hash a file without loading it whole into Python
+
+    hashlib.file_digest (3.11+) streams inside OpenSSL; the fallback
+    reads into one reusable buffer instead of allocating per chunk.
+    """
+    with open(filepath, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        buffer = memoryview(bytearray(1 << 20))
+        while n := f.readinto(buffer):
+            digest.update(buffer[:n])
+        return digest.hexdigest()
+
+
 def test_deduplication():
     """Test deduplication functionality"""
     print("=" * 60)
@@ -52,6 +68,10 @@ def test_deduplication():
         if result2['success'] and result2['is_duplicate']:
             print("   ✓ Duplicate detected successfully")
             print(f"   Space saved: {result2['space_saved']} bytes")
+            if file_sha256(file1) == file_sha256(file2):
+                print("   ✓ Content hashes match")
+            else:
+                print("   ✗ Content hashes differ")
         else:
             print("   ✗ Test failed")
         
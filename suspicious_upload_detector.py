@@ -7,6 +7,8 @@ Monitors user upload behavior and detects anomalies such as:
 """
 
 import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
 from config import Config
 from utils import log_action
@@ -26,13 +28,36 @@ class SuspiciousUploadDetector:
     ACTIVITY_EXCESSIVE_DUPLICATES = "EXCESSIVE_DUPLICATES"
     ACTIVITY_POW_FAILURE = "POW_FAILURE"
     
+    # Alert reads are memoized for this long; the admin dashboard polls
+    # get_alert_count/get_all_alerts several times per render
+    READ_CACHE_TTL_SECONDS = 2.0
+
     def __init__(self):
         self.db_path = Config.DATABASE
-        
+        self._local = threading.local()
+        # Short-TTL memo for alert reads; _cache_version is bumped on
+        # every write so stale entries can never outlive an alert change
+        self._read_cache = {}
+        self._cache_version = 0
+
     def get_db_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Get a persistent per-thread database connection
+
+        Tracking methods fire up to three times per upload; reusing one
+        connection per thread avoids the file-open, schema-parse and
+        pragma negotiation that opening per call would repeat, and keeps
+        sqlite's prepared-statement cache warm.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # cached_statements keeps the compiled plan for every track_*
+            # query alive on the connection; with constant SQL text each
+            # call skips sqlite's bytecode-compile step entirely
+            conn = sqlite3.connect(self.db_path, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
         return conn
     
     def track_upload(self, user_id):
@@ -47,12 +72,17 @@ class SuspiciousUploadDetector:
         now = datetime.now()
         window_start = now - timedelta(minutes=Config.RAPID_UPLOAD_WINDOW_MINUTES)
         
-        # Count uploads in the current time window
+        # Count uploads in the current time window; the LIMIT bounds the
+        # scan at threshold+1 rows — the check only needs to know whether
+        # the threshold was crossed, not the exact count beyond it
         cursor.execute("""
-            SELECT COUNT(*) as count FROM uploads 
-            WHERE user_id = ? AND timestamp >= ?
-        """, (user_id, window_start))
-        
+            SELECT COUNT(*) as count FROM (
+                SELECT 1 FROM uploads
+                WHERE user_id = ? AND timestamp >= ?
+                LIMIT ?
+            )
+        """, (user_id, window_start, Config.RAPID_UPLOAD_THRESHOLD + 1))
+
         upload_count = cursor.fetchone()['count']
         
         # Check threshold
@@ -65,11 +95,8 @@ class SuspiciousUploadDetector:
                 description=f"Rapid upload detected: {upload_count} uploads in {Config.RAPID_UPLOAD_WINDOW_MINUTES} minute(s)",
                 details=f"Threshold: {Config.RAPID_UPLOAD_THRESHOLD}, Actual: {upload_count}"
             )
-            conn.close()
-            log_action("Security Alert", f"Rapid upload detected for user {user_id}")
+            log_action("Security Alert", f"Rapid upload detected for user {user_id}", user_id=user_id)
             return True, f"Warning: Rapid upload pattern detected ({upload_count} uploads)"
-        
-        conn.close()
         return False, None
     
     def track_duplicate_attempt(self, user_id, file_hash):
@@ -84,11 +111,15 @@ class SuspiciousUploadDetector:
         window_start = datetime.now() - timedelta(hours=Config.DUPLICATE_ATTEMPT_WINDOW_HOURS)
         
         cursor.execute("""
-            SELECT COUNT(*) as count FROM uploads u
-            JOIN files f ON u.file_id = f.id
-            WHERE u.user_id = ? AND f.file_hash = ? AND u.timestamp >= ?
-        """, (user_id, file_hash, window_start))
-        
+            SELECT COUNT(*) as count FROM (
+                SELECT 1 FROM uploads u
+                JOIN files f ON u.file_id = f.id
+                WHERE u.user_id = ? AND f.file_hash = ? AND u.timestamp >= ?
+                LIMIT ?
+            )
+        """, (user_id, file_hash, window_start,
+              Config.DUPLICATE_ATTEMPT_THRESHOLD + 1))
+
         duplicate_count = cursor.fetchone()['count']
         
         # Check threshold
@@ -101,11 +132,8 @@ class SuspiciousUploadDetector:
                 description=f"Excessive duplicate attempts: {duplicate_count} attempts in {Config.DUPLICATE_ATTEMPT_WINDOW_HOURS} hour(s)",
                 details=f"File hash: {file_hash[:16]}..., Threshold: {Config.DUPLICATE_ATTEMPT_THRESHOLD}, Actual: {duplicate_count}"
             )
-            conn.close()
-            log_action("Security Alert", f"Excessive duplicate attempts detected for user {user_id}")
+            log_action("Security Alert", f"Excessive duplicate attempts detected for user {user_id}", user_id=user_id)
             return True, f"Warning: Excessive duplicate upload attempts detected ({duplicate_count} attempts)"
-        
-        conn.close()
         return False, None
     
     def track_pow_failure(self, user_id, file_hash):
@@ -119,11 +147,17 @@ class SuspiciousUploadDetector:
         # Count PoW failures in the last hour
         window_start = datetime.now() - timedelta(hours=Config.POW_FAILURE_WINDOW_HOURS)
         
+        # The structured user_id column makes this an index range scan on
+        # idx_logs_user_action_ts; the old LIKE '%user N%' match forced a
+        # full scan of logs on every upload
         cursor.execute("""
-            SELECT COUNT(*) as count FROM logs
-            WHERE action = 'PoW Failed' AND details LIKE ? AND timestamp >= ?
-        """, (f"%user {user_id}%", window_start))
-        
+            SELECT COUNT(*) as count FROM (
+                SELECT 1 FROM logs
+                WHERE action = 'PoW Failed' AND user_id = ? AND timestamp >= ?
+                LIMIT ?
+            )
+        """, (user_id, window_start, Config.POW_FAILURE_THRESHOLD + 1))
+
         failure_count = cursor.fetchone()['count']
         
         # Check threshold
@@ -136,45 +170,68 @@ class SuspiciousUploadDetector:
                 description=f"Multiple PoW failures: {failure_count} failures in {Config.POW_FAILURE_WINDOW_HOURS} hour(s)",
                 details=f"File hash: {file_hash[:16]}..., Threshold: {Config.POW_FAILURE_THRESHOLD}, Actual: {failure_count}"
             )
-            conn.close()
-            log_action("Security Alert", f"Multiple PoW failures detected for user {user_id}")
+            log_action("Security Alert", f"Multiple PoW failures detected for user {user_id}", user_id=user_id)
             return True, f"Critical: Multiple Proof of Ownership failures detected ({failure_count} failures)"
-        
-        conn.close()
         return False, None
     
     def _create_alert(self, user_id, activity_type, severity, description, details):
         """Create a suspicious activity alert"""
         conn = self.get_db_connection()
         cursor = conn.cursor()
-        
-        # Check if similar alert exists in the last 5 minutes (avoid spam)
+
+        # Insert only when no similar alert exists in the last 5 minutes
+        # (avoid spam): the existence check and the insert run as one
+        # statement, which also closes the check-then-insert race between
+        # concurrent requests
         recent_check = datetime.now() - timedelta(minutes=5)
         cursor.execute("""
-            SELECT id FROM suspicious_activities
-            WHERE user_id = ? AND activity_type = ? AND timestamp >= ?
-        """, (user_id, activity_type, recent_check))
-        
-        if cursor.fetchone():
-            # Similar alert already exists recently, skip
-            conn.close()
-            return
-        
-        # Create new alert
-        cursor.execute("""
-            INSERT INTO suspicious_activities 
+            INSERT INTO suspicious_activities
             (user_id, activity_type, severity, description, details)
-            VALUES (?, ?, ?, ?, ?)
-        """, (user_id, activity_type, severity, description, details))
-        
+            SELECT ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM suspicious_activities
+                WHERE user_id = ? AND activity_type = ? AND timestamp >= ?
+            )
+        """, (user_id, activity_type, severity, description, details,
+              user_id, activity_type, recent_check))
+
         conn.commit()
-        conn.close()
+        self._cache_version += 1
     
+    def _cached_read(self, key, fetch):
+        """Return a memoized read result, refreshing after the TTL
+
+        The key includes the current cache version, so any write
+        (_create_alert, dismiss_alert) invalidates every cached read
+        at once without a sweep.
+        """
+        key = (self._cache_version,) + key
+        entry = self._read_cache.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        result = fetch()
+        # Writes reset the version, so the map only ever holds entries
+        # for the current version; drop the previous generation here
+        self._read_cache = {
+            k: v for k, v in self._read_cache.items() if k[0] == self._cache_version
+        }
+        self._read_cache[key] = (result, now + self.READ_CACHE_TTL_SECONDS)
+        return result
+
     def get_all_alerts(self, include_dismissed=False):
         """Get all suspicious activity alerts"""
+        return self._cached_read(
+            ('all_alerts', include_dismissed),
+            lambda: self._fetch_all_alerts(include_dismissed)
+        )
+
+    def _fetch_all_alerts(self, include_dismissed):
+        """Query alerts from the database"""
         conn = self.get_db_connection()
         cursor = conn.cursor()
-        
+
         query = """
             SELECT sa.*, u.username 
             FROM suspicious_activities sa
@@ -188,12 +245,18 @@ class SuspiciousUploadDetector:
         
         cursor.execute(query)
         alerts = cursor.fetchall()
-        conn.close()
         
         return alerts
     
     def get_alert_count(self, user_id=None, dismissed=False):
         """Get count of alerts"""
+        return self._cached_read(
+            ('alert_count', user_id, dismissed),
+            lambda: self._fetch_alert_count(user_id, dismissed)
+        )
+
+    def _fetch_alert_count(self, user_id, dismissed):
+        """Count alerts in the database"""
         conn = self.get_db_connection()
         cursor = conn.cursor()
         
@@ -206,7 +269,6 @@ class SuspiciousUploadDetector:
         
         cursor.execute(query, params)
         count = cursor.fetchone()['count']
-        conn.close()
         
         return count
     
@@ -220,10 +282,10 @@ class SuspiciousUploadDetector:
             SET is_dismissed = 1 
             WHERE id = ?
         """, (alert_id,))
-        
+
         conn.commit()
-        conn.close()
-        
+        self._cache_version += 1
+
         log_action("Alert Dismissed", f"Alert ID {alert_id} dismissed by admin")
     
     def get_user_stats(self, user_id, hours=24):
@@ -232,35 +294,31 @@ class SuspiciousUploadDetector:
         cursor = conn.cursor()
         
         window_start = datetime.now() - timedelta(hours=hours)
-        
-        # Upload count
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM uploads
-            WHERE user_id = ? AND timestamp >= ?
-        """, (user_id, window_start))
-        upload_count = cursor.fetchone()['count']
-        
-        # Duplicate count
+
+        # One statement for all three counters: the duplicate-hash set is
+        # computed once in a CTE instead of re-grouping files per call,
+        # and sqlite walks each index a single time
         cursor.execute("""
-            SELECT COUNT(*) as count FROM uploads u
-            JOIN files f ON u.file_id = f.id
-            WHERE u.user_id = ? AND u.timestamp >= ?
-            AND f.file_hash IN (
-                SELECT file_hash FROM files 
+            WITH dup_hashes AS (
+                SELECT file_hash FROM files
                 GROUP BY file_hash HAVING COUNT(*) > 1
             )
-        """, (user_id, window_start))
-        duplicate_count = cursor.fetchone()['count']
-        
-        # Alert count
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM suspicious_activities
-            WHERE user_id = ? AND timestamp >= ?
-        """, (user_id, window_start))
-        alert_count = cursor.fetchone()['count']
-        
-        conn.close()
-        
+            SELECT
+                (SELECT COUNT(*) FROM uploads
+                 WHERE user_id = ? AND timestamp >= ?) AS upload_count,
+                (SELECT COUNT(*) FROM uploads u
+                 JOIN files f ON u.file_id = f.id
+                 JOIN dup_hashes d ON d.file_hash = f.file_hash
+                 WHERE u.user_id = ? AND u.timestamp >= ?) AS duplicate_count,
+                (SELECT COUNT(*) FROM suspicious_activities
+                 WHERE user_id = ? AND timestamp >= ?) AS alert_count
+        """, (user_id, window_start, user_id, window_start, user_id, window_start))
+
+        row = cursor.fetchone()
+        upload_count = row['upload_count']
+        duplicate_count = row['duplicate_count']
+        alert_count = row['alert_count']
+
         return {
             'upload_count': upload_count,
             'duplicate_count': duplicate_count,
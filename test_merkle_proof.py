@@ -0,0 +1,82 @@
+"""
+Unit tests for the Merkle tree ownership-proof helpers
+"""
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'secure_cloud_dedup_optimized'))
+
+from backend.optimized_encryption import OptimizedEncryption
+
+CHUNK_SIZE = 1024
+
+
+@pytest.fixture
+def encryptor():
+    return OptimizedEncryption(chunk_size=CHUNK_SIZE)
+
+
+def _write_chunks(tmp_path, n_chunks, tail=0):
+    """Write a file spanning n_chunks full chunks plus a partial tail"""
+    path = tmp_path / "data.bin"
+    path.write_bytes(os.urandom(n_chunks * CHUNK_SIZE + tail))
+    return str(path)
+
+
+@pytest.mark.parametrize("n_chunks,tail", [(1, 0), (2, 0), (3, 7), (8, 1)],
+                         ids=["single", "even", "odd_with_tail", "nine_leaves"])
+def test_every_leaf_verifies(encryptor, tmp_path, n_chunks, tail):
+    path = _write_chunks(tmp_path, n_chunks, tail)
+    tree = encryptor.build_merkle_tree(path)
+
+    for index, leaf in enumerate(tree['leaves']):
+        proof = encryptor.merkle_proof(tree['leaves'], index)
+        assert encryptor.verify_merkle_proof(leaf, proof, tree['root'])
+
+
+def test_challenged_chunk_rehash_matches(encryptor, tmp_path):
+    """The ownership flow: rehash one chunk and verify it against the root"""
+    path = _write_chunks(tmp_path, 5)
+    tree = encryptor.build_merkle_tree(path)
+
+    index = 3
+    with open(path, 'rb') as f:
+        f.seek(index * CHUNK_SIZE)
+        chunk = f.read(CHUNK_SIZE)
+
+    proof = encryptor.merkle_proof(tree['leaves'], index)
+    assert encryptor.verify_merkle_proof(
+        hashlib.sha256(chunk).digest(), proof, tree['root']
+    )
+
+
+def test_wrong_chunk_fails(encryptor, tmp_path):
+    path = _write_chunks(tmp_path, 4)
+    tree = encryptor.build_merkle_tree(path)
+
+    proof = encryptor.merkle_proof(tree['leaves'], 2)
+    forged = hashlib.sha256(b'not the challenged chunk').digest()
+    assert not encryptor.verify_merkle_proof(forged, proof, tree['root'])
+
+
+def test_proof_for_other_leaf_fails(encryptor, tmp_path):
+    path = _write_chunks(tmp_path, 4)
+    tree = encryptor.build_merkle_tree(path)
+
+    proof = encryptor.merkle_proof(tree['leaves'], 1)
+    assert not encryptor.verify_merkle_proof(tree['leaves'][0], proof, tree['root'])
+
+
+def test_empty_file_single_leaf(encryptor, tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    tree = encryptor.build_merkle_tree(str(path))
+
+    assert tree['leaves'] == [hashlib.sha256(b'').digest()]
+    proof = encryptor.merkle_proof(tree['leaves'], 0)
+    assert proof == []
+    assert encryptor.verify_merkle_proof(tree['leaves'][0], proof, tree['root'])
@@ -2,6 +2,7 @@
 Quick test script to verify content similarity detection is working
 """
 import sys
+import traceback
 sys.path.insert(0, '.')
 
 from content_similarity import detect_similar_content
@@ -22,7 +23,6 @@ try:
     print(f"Result: {result}")
 except Exception as e:
     print(f"✗ Error: {e}")
-    import traceback
     traceback.print_exc()
 
 print("=" * 60)
@@ -1,118 +1,266 @@
+import functools
 import hashlib
 import os
+import threading
+from datetime import datetime
+
+import db
+from botocore.exceptions import NoCredentialsError
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers import Cipher
+from cryptography.hazmat.primitives.ciphers.algorithms import AES
+from cryptography.hazmat.primitives.ciphers.modes import GCM
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 from config import Config
 
+# Files at or above this size are encrypted with streaming AES-GCM in
+# fixed-size chunks; smaller files keep the Fernet whole-file token
+# format (and all previously stored files remain Fernet tokens)
+STREAM_THRESHOLD = 4 * 1024 * 1024
+_STREAM_MAGIC = b'AGC1'
+_STREAM_CHUNK = 1 << 20
+_GCM_NONCE_SIZE = 12
+_GCM_TAG_SIZE = 16
+
+def _advise_sequential(f):
+    """Hint the kernel to read ahead aggressively for a sequential scan."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
 def get_file_hash(file_path):
     """Generate SHA-256 hash for a file."""
-    sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+        _advise_sequential(f)
+        # file_digest runs the read+update loop in C with a reused buffer
+        # and lets OpenSSL pick its fastest SHA-256 backend; the fallback
+        # for older Pythons reads into one reusable 1 MiB buffer instead
+        # of allocating a bytes object per 4 KiB block
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        sha256_hash = hashlib.sha256()
+        buffer = memoryview(bytearray(1 << 20))
+        while n := f.readinto(buffer):
+            sha256_hash.update(buffer[:n])
+        return sha256_hash.hexdigest()
 
 def get_string_hash(data):
     """Generate SHA-256 hash for a string."""
     return hashlib.sha256(data.encode()).hexdigest()
 
+@functools.lru_cache(maxsize=4)
+def _derive_fernet_key(aes_key, salt):
+    """Derive a Fernet key from a master key via PBKDF2.
+
+    Cached: the derivation is deterministic for a fixed key and salt, and
+    every encrypt/decrypt with the default key would otherwise pay the
+    full 100k HMAC-SHA256 iterations again.
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(aes_key))
+
+def _raw_aes_key(fernet_key):
+    """Unwrap the 32-byte AES key from a Fernet-format (base64) key."""
+    return base64.urlsafe_b64decode(fernet_key)
+
+@functools.lru_cache(maxsize=4)
+def _get_fernet(key):
+    """Build a Fernet for a key once and reuse it.
+
+    Fernet.__init__ base64-decodes the key and splits it into signing and
+    encryption halves on every construction; the instance itself holds no
+    per-message state, so one object per key is safe to share across
+    threads.
+    """
+    return Fernet(key)
+
+def _stream_encrypt(file_path, output_path, fernet_key):
+    """Encrypt a file with AES-GCM in fixed-size chunks.
+
+    Ciphertext is written as it is produced through a reused buffer, so
+    memory stays at one chunk regardless of file size — the Fernet path
+    holds plaintext, ciphertext and a base64 copy at once.
+    Format: magic(4) || nonce(12) || ciphertext || tag(16).
+    """
+    nonce = os.urandom(_GCM_NONCE_SIZE)
+    encryptor = Cipher(AES(_raw_aes_key(fernet_key)), GCM(nonce)).encryptor()
+
+    in_buf = bytearray(_STREAM_CHUNK)
+    in_view = memoryview(in_buf)
+    # update_into may emit up to a block more than it consumed
+    out_buf = bytearray(_STREAM_CHUNK + 16)
+    out_view = memoryview(out_buf)
+
+    with open(file_path, 'rb') as src, open(output_path, 'wb') as dst:
+        dst.write(_STREAM_MAGIC)
+        dst.write(nonce)
+        while n := src.readinto(in_buf):
+            written = encryptor.update_into(in_view[:n], out_buf)
+            dst.write(out_view[:written])
+        encryptor.finalize()
+        dst.write(encryptor.tag)
+
+def _stream_decrypt(file_path, output_path, fernet_key):
+    """Decrypt a file written by _stream_encrypt."""
+    ciphertext_len = (
+        os.path.getsize(file_path)
+        - len(_STREAM_MAGIC) - _GCM_NONCE_SIZE - _GCM_TAG_SIZE
+    )
+
+    in_buf = bytearray(_STREAM_CHUNK)
+    in_view = memoryview(in_buf)
+    out_buf = bytearray(_STREAM_CHUNK + 16)
+    out_view = memoryview(out_buf)
+
+    with open(file_path, 'rb') as src, open(output_path, 'wb') as dst:
+        src.seek(len(_STREAM_MAGIC))
+        nonce = src.read(_GCM_NONCE_SIZE)
+        decryptor = Cipher(AES(_raw_aes_key(fernet_key)), GCM(nonce)).decryptor()
+
+        remaining = ciphertext_len
+        while remaining > 0:
+            n = src.readinto(in_view[:min(remaining, _STREAM_CHUNK)])
+            if not n:
+                raise ValueError("Encrypted file is truncated")
+            written = decryptor.update_into(in_view[:n], out_buf)
+            dst.write(out_view[:written])
+            remaining -= n
+        tag = src.read(_GCM_TAG_SIZE)
+        decryptor.finalize_with_tag(tag)
+
 def encrypt_file(file_path, output_path, key=None):
-    """Encrypt file using Fernet (AES)."""
+    """Encrypt file using Fernet (AES), streaming AES-GCM for large files."""
     if key is None:
         # Generate a key from Config.AES_KEY for Fernet compatibility
-        salt = b'salt_' # In production use random salt
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(Config.AES_KEY))
-    
+        key = _derive_fernet_key(Config.AES_KEY, b'salt_')  # In production use random salt
+
     # Ensure output directory exists
     output_dir = os.path.dirname(output_path)
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir, exist_ok=True)
-    
-    fernet = Fernet(key)
+
+    if os.path.getsize(file_path) >= STREAM_THRESHOLD:
+        _stream_encrypt(file_path, output_path, key)
+        return key
+
+    fernet = _get_fernet(key)
     with open(file_path, 'rb') as f:
         data = f.read()
-    
+
     encrypted_data = fernet.encrypt(data)
     with open(output_path, 'wb') as f:
         f.write(encrypted_data)
     return key
 
 def decrypt_file(file_path, output_path, key=None):
-    """Decrypt file using Fernet (AES)."""
+    """Decrypt file using Fernet (AES) or the streaming AES-GCM format."""
     if key is None:
         # Generate the same key used for encryption
-        salt = b'salt_'
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(Config.AES_KEY))
-        
-    fernet = Fernet(key)
+        key = _derive_fernet_key(Config.AES_KEY, b'salt_')
+
+    # The magic prefix distinguishes streamed files from Fernet tokens
+    # (which are base64 text), so existing stored files still decrypt
+    with open(file_path, 'rb') as f:
+        magic = f.read(len(_STREAM_MAGIC))
+    if magic == _STREAM_MAGIC:
+        _stream_decrypt(file_path, output_path, key)
+        return
+
+    fernet = _get_fernet(key)
     with open(file_path, 'rb') as f:
         encrypted_data = f.read()
-    
+
     decrypted_data = fernet.decrypt(encrypted_data)
     with open(output_path, 'wb') as f:
         f.write(decrypted_data)
 
-def log_action(action, details):
+# Logging sinks shared across calls: pooled WAL connections via db plus
+# one buffered file handle opened lazily, instead of a
+# connect/open/close per entry
+_log_lock = threading.Lock()
+_log_fh = None
+
+def _get_log_fh():
+    """Lazy-open the shared, buffered log file handle."""
+    global _log_fh
+    if _log_fh is None:
+        _log_fh = open(os.path.join(Config.LOGS_DIR, 'system.log'), 'a',
+                       buffering=1 << 16)
+    return _log_fh
+
+def log_action(action, details, user_id=None):
     """Append log entry to logs directory."""
-    import sqlite3
-    from datetime import datetime
-    conn = sqlite3.connect(Config.DATABASE)
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO logs (action, details) VALUES (?, ?)", (action, details))
-    conn.commit()
-    conn.close()
-    
-    log_file = os.path.join(Config.LOGS_DIR, 'system.log')
-    with open(log_file, 'a') as f:
-        f.write(f"[{datetime.now()}] {action}: {details}\n")
+    with _log_lock:
+        with db.connection() as conn:
+            conn.execute("INSERT INTO logs (action, details, user_id) VALUES (?, ?, ?)",
+                         (action, details, user_id))
+            conn.commit()
+        _get_log_fh().write(f"[{datetime.now()}] {action}: {details}\n")
 
 # S3 Client Lazy-Loader
 _s3_client_instance = None
+_s3_transfer_config = None
 
 def get_s3_client():
     """Lazy-load and return the S3 client."""
     global _s3_client_instance
     if not Config.USE_S3:
         return None
-        
+
     if _s3_client_instance is None:
         try:
             import boto3
+            from botocore.config import Config as BotoConfig
+            # Pooled keep-alive connections: concurrent request workers
+            # share warm TLS sessions instead of handshaking per call
             _s3_client_instance = boto3.client(
                 's3',
                 aws_access_key_id=Config.AWS_ACCESS_KEY,
                 aws_secret_access_key=Config.AWS_SECRET_KEY,
-                region_name=Config.AWS_REGION
+                region_name=Config.AWS_REGION,
+                config=BotoConfig(
+                    max_pool_connections=50,
+                    tcp_keepalive=True,
+                    retries={'mode': 'adaptive'}
+                )
             )
         except Exception as e:
             print(f"Failed to initialize S3 client: {e}")
             return None
     return _s3_client_instance
 
+def _get_transfer_config():
+    """Shared transfer settings: multipart with concurrent part uploads."""
+    global _s3_transfer_config
+    if _s3_transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+        _s3_transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=16 * 1024 * 1024,
+            max_concurrency=10,
+            use_threads=True
+        )
+    return _s3_transfer_config
+
 def upload_to_s3(file_path, object_name):
     """Upload a file to an S3 bucket."""
     s3 = get_s3_client()
     if not s3:
         return False
     try:
-        s3.upload_file(file_path, Config.S3_BUCKET_NAME, object_name)
+        s3.upload_file(file_path, Config.S3_BUCKET_NAME, object_name,
+                       Config=_get_transfer_config())
         return True
     except Exception as e:
-        from botocore.exceptions import NoCredentialsError
         if isinstance(e, NoCredentialsError):
             print("AWS credentials not found.")
         else:
@@ -125,7 +273,8 @@ def download_from_s3(object_name, local_path):
     if not s3:
         return False
     try:
-        s3.download_file(Config.S3_BUCKET_NAME, object_name, local_path)
+        s3.download_file(Config.S3_BUCKET_NAME, object_name, local_path,
+                         Config=_get_transfer_config())
         return True
     except Exception as e:
         print(f"S3 Download Error: {e}")